@@ -1,23 +1,90 @@
 # src/classifier.py
 """Orchestrate format detection, content extraction, and content classification."""
 
-from src.detectors import (
-    detect_extension,
-    detect_mime,
-    match_extension,
-    match_mime,
-    get_file_metadata,
-)
-from src.content_extractor import extract_text
-from src.content_matcher import match_keywords, match_patterns
-
-
-def classify_file(file_path: str, config) -> dict:
+from concurrent.futures import ThreadPoolExecutor
+
+from src.detectors import detect_all, match_extension, match_mime
+from src.content_extractor import extract_text_pages
+from src.content_matcher import TextBundle, analyze_text, extract_fields
+from src.scorer import score_candidates, select_best_candidate
+
+
+def _detect_format(file_path: str, types: dict) -> tuple:
+    """Stage 1: Format Detection. Returns (extension, mime, metadata, matches)."""
+    detected = detect_all(file_path)
+    extension = detected["extension"]
+    mime_type = detected["mime_type"]
+    metadata = detected["metadata"]
+
+    ext_matches = match_extension(extension, types)
+    mime_matches = match_mime(mime_type, types)
+    format_matches = set(ext_matches) | set(mime_matches)
+    return extension, mime_type, metadata, format_matches
+
+
+def _build_candidates(
+    format_matches: set, keyword_matches: dict, pattern_matches: dict, config
+) -> dict:
+    """Map each candidate type to the list of signals it matched."""
+    all_candidates = format_matches | keyword_matches.keys() | pattern_matches.keys()
+    fm = config.folder_mappings
+    nc = config.naming_conventions.get("patterns", {})
+    candidates = {}
+    for type_name in all_candidates:
+        matched = []
+        if type_name in format_matches:
+            matched.append("format_match")
+        if type_name in keyword_matches:
+            matched.append("keyword_match")
+        if type_name in pattern_matches:
+            matched.append("pattern_match")
+        # Reference match: type has folder mapping + naming convention
+        if type_name in fm and type_name in nc:
+            matched.append("reference_match")
+        candidates[type_name] = {"matched_signals": matched}
+    return candidates
+
+
+def _is_confident(
+    text: str, text_lower: str, format_matches: set, config
+) -> bool:
+    """
+    True when the text read so far already yields an auto-file decision:
+    the best candidate clears the confidence threshold and every required
+    extraction field for that type is present.
+    """
+    types = config.type_definitions
+    rules = config.classification_rules
+    bundle = TextBundle(text, text_lower)
+    signals = analyze_text(bundle, types)
+    candidates = _build_candidates(
+        format_matches,
+        signals["keyword_matches"],
+        signals["pattern_matches"],
+        config,
+    )
+    scored = score_candidates({"candidates": candidates}, rules)
+    best_type, best_data = select_best_candidate(
+        scored, rules.get("min_signals_required", 2)
+    )
+    if best_data is None:
+        return False
+    if best_data["score"] < config.settings["confidence_threshold"]:
+        return False
+    _, missing = extract_fields(bundle, best_type, types)
+    return not missing
+
+
+def classify_file(file_path: str, config, early_exit: bool = False) -> dict:
     """
     Run all detection and content signals against a file.
 
     Pipeline: Format Detection -> Text Extraction -> Content Classification
 
+    Text is extracted page by page. With early_exit=True, extraction stops
+    as soon as the pages read so far are enough to auto-file the document,
+    so "extracted_text" may cover only the leading pages.
+
     Returns:
         {
             "file_path": str,
@@ -40,43 +107,41 @@ def classify_file(file_path: str, config) -> dict:
     types = config.type_definitions
     settings = config.settings
 
-    # Stage 1: Format Detection
-    extension = detect_extension(file_path)
-    mime_type = detect_mime(file_path)
-    metadata = get_file_metadata(file_path)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Stage 1: Format Detection — independent of the text, so run it
+        # alongside OCR of the first page
+        format_future = executor.submit(_detect_format, file_path, types)
 
-    ext_matches = match_extension(extension, types)
-    mime_matches = match_mime(mime_type, types)
-    format_matches = list(set(ext_matches + mime_matches))
+        # Stage 2: Content Extraction (OCR), one page at a time
+        # Case-fold each page once as it arrives; keyword matching reuses it
+        pages = []
+        pages_lower = []
+        format_matches = None
+        for page_text in extract_text_pages(file_path, settings):
+            pages.append(page_text)
+            pages_lower.append(page_text.lower())
+            if not early_exit:
+                continue
+            if format_matches is None:
+                format_matches = format_future.result()[3]
+            if _is_confident(
+                "\n".join(pages), "\n".join(pages_lower), format_matches, config
+            ):
+                break
 
-    # Stage 2: Content Extraction (OCR)
-    extracted_text = extract_text(file_path, settings)
+        extension, mime_type, metadata, format_matches = format_future.result()
+
+    extracted_text = "\n".join(pages)
+    text_lower = "\n".join(pages_lower)
 
     # Stage 3: Content Classification
-    keyword_matches = match_keywords(extracted_text, types)
-    pattern_matches = match_patterns(extracted_text, types)
-
-    # Build candidate map
-    all_candidates = (
-        set(format_matches)
-        | set(keyword_matches.keys())
-        | set(pattern_matches.keys())
+    signals = analyze_text(TextBundle(extracted_text, text_lower), types)
+    keyword_matches = signals["keyword_matches"]
+    pattern_matches = signals["pattern_matches"]
+
+    candidates = _build_candidates(
+        format_matches, keyword_matches, pattern_matches, config
     )
-    candidates = {}
-    for type_name in all_candidates:
-        matched = []
-        if type_name in format_matches:
-            matched.append("format_match")
-        if type_name in keyword_matches:
-            matched.append("keyword_match")
-        if type_name in pattern_matches:
-            matched.append("pattern_match")
-        # Reference match: type has folder mapping + naming convention
-        fm = config.folder_mappings
-        nc = config.naming_conventions.get("patterns", {})
-        if type_name in fm and type_name in nc:
-            matched.append("reference_match")
-        candidates[type_name] = {"matched_signals": matched}
 
     return {
         "file_path": file_path,
@@ -85,7 +150,7 @@ def classify_file(file_path: str, config) -> dict:
         "metadata": metadata,
         "extracted_text": extracted_text,
         "signals": {
-            "format_matches": format_matches,
+            "format_matches": sorted(format_matches),
             "keyword_matches": keyword_matches,
             "pattern_matches": pattern_matches,
         },
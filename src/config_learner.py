@@ -1,31 +1,131 @@
 # src/config_learner.py
 """Persist user-approved learning to type_definitions.json and fieldname_ref.json."""
 
-import json
 import pathlib
 import re
-import threading
+from contextlib import contextmanager
 from datetime import date
 
+from src.config_loader import (
+    lock_for, atomic_write_bytes, dumps_json, loads_json,
+)
 
-_config_lock = threading.Lock()
 
+class _TypeDefinitionBatch:
+    """
+    Mutators applied to one in-memory copy of type_definitions.json.
+
+    Obtained from batch_update(); each method returns the same result as
+    its module-level counterpart.
+    """
+
+    def __init__(self, td: dict):
+        self.td = td
+        # Dedup indexes built on first use and kept in step with each add,
+        # so repeated calls in one batch don't rescan the existing lists.
+        # Held here rather than on the typedefs so they are never serialized.
+        self._indexes: dict[tuple, set] = {}
+
+    def _index(self, key: tuple, values: list, fold_case: bool = False) -> set:
+        index = self._indexes.get(key)
+        if index is None:
+            if fold_case:
+                index = {v.lower() for v in values}
+            else:
+                index = set(values)
+            self._indexes[key] = index
+        return index
+
+    def add_keywords(self, type_name: str, new_keywords: list[str]) -> int:
+        typedef = self.td["types"].get(type_name)
+        if not typedef:
+            return 0
+        added = 0
+        existing = self._index(
+            ("kw", type_name), typedef.get("content_keywords", []), fold_case=True
+        )
+        for kw in new_keywords:
+            if kw.lower() not in existing:
+                typedef.setdefault("content_keywords", []).append(kw)
+                existing.add(kw.lower())
+                added += 1
+        return added
+
+    def add_patterns(self, type_name: str, new_patterns: list[str]) -> int:
+        typedef = self.td["types"].get(type_name)
+        if not typedef:
+            return 0
+        added = 0
+        existing = self._index(
+            ("pat", type_name), typedef.get("content_patterns", [])
+        )
+        for pattern in new_patterns:
+            # Validate regex
+            try:
+                re.compile(pattern)
+            except re.error:
+                continue
+            if pattern not in existing:
+                typedef.setdefault("content_patterns", []).append(pattern)
+                existing.add(pattern)
+                added += 1
+        return added
 
-def _read_modify_write(config, mutator):
+    def add_extraction_patterns(
+        self, type_name: str, field_name: str, new_patterns: list[str]
+    ) -> int:
+        typedef = self.td["types"].get(type_name)
+        if not typedef:
+            return 0
+        field_defs = typedef.setdefault("extraction_fields", {})
+        field_cfg = field_defs.get(field_name)
+        if not field_cfg:
+            return 0
+        added = 0
+        existing = self._index(
+            ("ext", type_name, field_name), field_cfg.get("patterns", [])
+        )
+        for pattern in new_patterns:
+            try:
+                re.compile(pattern)
+            except re.error:
+                continue
+            if pattern not in existing:
+                field_cfg.setdefault("patterns", []).append(pattern)
+                existing.add(pattern)
+                added += 1
+        return added
+
+    def add_extraction_field(
+        self, type_name: str, field_name: str, field_config: dict
+    ):
+        typedef = self.td["types"].get(type_name)
+        if not typedef:
+            return
+        field_defs = typedef.setdefault("extraction_fields", {})
+        if field_name not in field_defs:
+            field_defs[field_name] = field_config
+
+
+@contextmanager
+def batch_update(config):
     """
-    Thread-safe read-modify-write of type_definitions.json.
+    Read type_definitions.json once, apply several mutations, write once.
 
-    *mutator* receives the parsed dict and returns it after modification.
-    After writing, the config cache is reloaded.
+        with batch_update(config) as batch:
+            batch.add_keywords("invoice", ["remit to"])
+            batch.add_patterns("invoice", [r"INV-\\d+"])
+
+    Nothing is written if the block raises. The file is replaced
+    atomically and the config cache is reloaded after the write.
     """
-    with _config_lock:
-        config_root = pathlib.Path(config.settings["config_path"])
-        td_path = config_root / "type_definitions.json"
-        td = json.loads(td_path.read_text(encoding="utf-8"))
-        td = mutator(td)
-        td_path.write_text(json.dumps(td, indent=2), encoding="utf-8")
-        config.reload("type_definitions.json")
-    return td
+    config_root = pathlib.Path(config.settings["config_path"])
+    td_path = config_root / "type_definitions.json"
+    with lock_for("type_definitions.json"):
+        td = loads_json(td_path.read_bytes())
+        yield _TypeDefinitionBatch(td)
+        atomic_write_bytes(td_path, dumps_json(td))
+    config.reload("type_definitions.json")
 
 
 def add_keywords_to_type(
@@ -38,23 +138,8 @@ def add_keywords_to_type(
 
     Returns the count of keywords actually added.
     """
-    added = 0
-
-    def mutator(td):
-        nonlocal added
-        typedef = td["types"].get(type_name)
-        if not typedef:
-            return td
-        existing = set(kw.lower() for kw in typedef.get("content_keywords", []))
-        for kw in new_keywords:
-            if kw.lower() not in existing:
-                typedef.setdefault("content_keywords", []).append(kw)
-                existing.add(kw.lower())
-                added += 1
-        return td
-
-    _read_modify_write(config, mutator)
-    return added
+    with batch_update(config) as batch:
+        return batch.add_keywords(type_name, new_keywords)
 
 
 def add_patterns_to_type(
@@ -67,28 +152,8 @@ def add_patterns_to_type(
 
     Returns the count of patterns actually added.
     """
-    added = 0
-
-    def mutator(td):
-        nonlocal added
-        typedef = td["types"].get(type_name)
-        if not typedef:
-            return td
-        existing = set(typedef.get("content_patterns", []))
-        for pattern in new_patterns:
-            # Validate regex
-            try:
-                re.compile(pattern)
-            except re.error:
-                continue
-            if pattern not in existing:
-                typedef.setdefault("content_patterns", []).append(pattern)
-                existing.add(pattern)
-                added += 1
-        return td
-
-    _read_modify_write(config, mutator)
-    return added
+    with batch_update(config) as batch:
+        return batch.add_patterns(type_name, new_patterns)
 
 
 def add_extraction_patterns(
@@ -102,31 +167,8 @@ def add_extraction_patterns(
 
     Returns the count of patterns actually added.
     """
-    added = 0
-
-    def mutator(td):
-        nonlocal added
-        typedef = td["types"].get(type_name)
-        if not typedef:
-            return td
-        field_defs = typedef.setdefault("extraction_fields", {})
-        field_cfg = field_defs.get(field_name)
-        if not field_cfg:
-            return td
-        existing = set(field_cfg.get("patterns", []))
-        for pattern in new_patterns:
-            try:
-                re.compile(pattern)
-            except re.error:
-                continue
-            if pattern not in existing:
-                field_cfg.setdefault("patterns", []).append(pattern)
-                existing.add(pattern)
-                added += 1
-        return td
-
-    _read_modify_write(config, mutator)
-    return added
+    with batch_update(config) as batch:
+        return batch.add_extraction_patterns(type_name, field_name, new_patterns)
 
 
 def add_extraction_field(
@@ -141,16 +183,8 @@ def add_extraction_field(
     field_config example:
         {"patterns": [...], "required": True, "reference_lookup": {"role": "vendor"}}
     """
-    def mutator(td):
-        typedef = td["types"].get(type_name)
-        if not typedef:
-            return td
-        field_defs = typedef.setdefault("extraction_fields", {})
-        if field_name not in field_defs:
-            field_defs[field_name] = field_config
-        return td
-
-    _read_modify_write(config, mutator)
+    with batch_update(config) as batch:
+        batch.add_extraction_field(type_name, field_name, field_config)
 
 
 # ------------------------------------------------------------------
@@ -160,12 +194,27 @@ def add_extraction_field(
 REF_PATH = "References/fieldname_ref.json"
 
 
+# Every byte-range character other than [a-z0-9] maps to "_"; runs are then
+# collapsed. Non-ASCII text after lower() keeps the regex path.
+_SLUG_TABLE = str.maketrans({
+    chr(c): "_" for c in range(256)
+    if not ("a" <= chr(c) <= "z" or "0" <= chr(c) <= "9")
+})
+_UNDERSCORE_RUN_RE = re.compile(r"_{2,}")
+_NON_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
 def _generate_entity_key(name: str) -> str:
-    """Slugify a name to a reference key."""
+    """Slugify a name to a reference key.
+
+    "William Kruse & Company LLC" -> "william_kruse_company_llc"
+    """
     slug = name.lower()
-    slug = re.sub(r"[^a-z0-9]+", "_", slug)
-    slug = slug.strip("_")
-    return slug
+    if slug.isascii():
+        slug = _UNDERSCORE_RUN_RE.sub("_", slug.translate(_SLUG_TABLE))
+    else:
+        slug = _NON_SLUG_RE.sub("_", slug)
+    return slug.strip("_")
 
 
 def add_entity_reference(
@@ -179,7 +228,7 @@ def add_entity_reference(
 
     Returns the entity key that was created.
     """
-    with _config_lock:
+    with lock_for(REF_PATH):
         entries = config.load_reference(REF_PATH)
 
         base_key = _generate_entity_key(name)
@@ -212,7 +261,7 @@ def add_alias_to_entity(
     Returns True if the alias was added, False if already present or
     entity not found.
     """
-    with _config_lock:
+    with lock_for(REF_PATH):
         entries = config.load_reference(REF_PATH)
         entity = entries.get(entity_key)
         if not entity:
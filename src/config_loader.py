@@ -2,34 +2,122 @@
 """Load and cache JSON configuration files."""
 
 import json
+import os
 import pathlib
+import tempfile
+import threading
+import time
+
+from src.derived_cache import invalidate
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Seconds a cached file is trusted before its mtime is checked again
+_STAT_CACHE_TTL = 1.0
+
+# One lock per config file, so writes to different files don't
+# serialize against each other
+_file_locks: dict[str, threading.RLock] = {}
+_file_locks_guard = threading.Lock()
+
+
+def lock_for(relative_path: str) -> threading.RLock:
+    """Return the lock guarding read-modify-write of *relative_path*."""
+    with _file_locks_guard:
+        lock = _file_locks.get(relative_path)
+        if lock is None:
+            lock = _file_locks[relative_path] = threading.RLock()
+        return lock
+
+
+def loads_json(raw: bytes) -> dict:
+    """Parse UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def dumps_json(data) -> bytes:
+    """Serialize to 2-space-indented UTF-8 JSON with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+        )
+    return (json.dumps(data, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def atomic_write_bytes(path: pathlib.Path, payload: bytes):
+    """
+    Replace *path* with *payload* atomically.
+
+    Writes to a temp file in the same directory and renames it over the
+    target, so a crash mid-write never leaves truncated JSON behind.
+    """
+    fd, tmp = tempfile.mkstemp(
+        dir=path.parent, prefix=path.name + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
 
 
 class ConfigLoader:
-    """Loads config files from the config directory and caches them in memory."""
+    """Loads config files from the config directory and caches them in memory.
+
+    Cached files are re-read only when their mtime changes on disk, so
+    callers never need to force a reload to pick up external edits.
+    """
 
     def __init__(self, config_path: str):
         self._root = pathlib.Path(config_path)
-        self._cache: dict = {}
+        # relative_path -> (last_stat_monotonic, mtime_ns, data)
+        self._cache: dict[str, tuple[float, int, dict]] = {}
+        # relative_path -> in-memory data with changes not yet on disk
+        self._dirty: dict[str, dict] = {}
 
     def _load(self, relative_path: str) -> dict:
-        """Load a JSON file relative to the config root, with caching."""
-        if relative_path not in self._cache:
-            full = self._root / relative_path
-            self._cache[relative_path] = json.loads(
-                full.read_text(encoding="utf-8")
-            )
-        return self._cache[relative_path]
+        """Load a JSON file relative to the config root, with mtime-checked caching."""
+        dirty = self._dirty.get(relative_path)
+        if dirty is not None:
+            # Unflushed edits win over whatever is on disk
+            return dirty
+
+        now = time.monotonic()
+        cached = self._cache.get(relative_path)
+        if cached and now - cached[0] < _STAT_CACHE_TTL:
+            return cached[2]
+
+        full = self._root / relative_path
+        mtime_ns = full.stat().st_mtime_ns
+        if cached and cached[1] == mtime_ns:
+            self._cache[relative_path] = (now, mtime_ns, cached[2])
+            return cached[2]
+
+        data = loads_json(full.read_bytes())
+        self._cache[relative_path] = (now, mtime_ns, data)
+        return data
 
     def _save(self, relative_path: str, data: dict):
         """Write JSON data to a config file and update the cache."""
         full = self._root / relative_path
         full.parent.mkdir(parents=True, exist_ok=True)
-        full.write_text(
-            json.dumps(data, indent=2, ensure_ascii=False) + "\n",
-            encoding="utf-8",
+        atomic_write_bytes(full, dumps_json(data))
+        # Callers save the dict they mutated in place; drop indexes built on it
+        invalidate(data)
+        self._cache[relative_path] = (
+            time.monotonic(), full.stat().st_mtime_ns, data,
         )
-        self._cache[relative_path] = data
+        self._dirty.pop(relative_path, None)
 
     def load_reference(self, relative_path: str) -> dict:
         """Load a reference JSON file relative to the config root."""
@@ -39,6 +127,26 @@ class ConfigLoader:
         """Persist updated reference data to disk."""
         self._save(relative_path, data)
 
+    def queue_reference_update(self, relative_path: str, data: dict):
+        """
+        Record in-memory changes to a reference file without writing it.
+
+        Later loads return *data* until flush_references() (or an explicit
+        save_reference) persists it, so a batch of auto-created entries
+        costs one file rewrite instead of one per entry.
+        """
+        invalidate(data)
+        self._dirty[relative_path] = data
+
+    def flush_references(self):
+        """Write every reference file queued by queue_reference_update()."""
+        for relative_path in list(self._dirty):
+            # Hold the file's lock so no resolver mutates it mid-encode
+            with lock_for(relative_path):
+                data = self._dirty.get(relative_path)
+                if data is not None:
+                    self._save(relative_path, data)
+
     def reload(self, relative_path: str | None = None):
         """Clear cache for one file or all files, forcing a fresh read."""
         if relative_path:
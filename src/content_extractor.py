@@ -1,44 +1,296 @@
 # src/content_extractor.py
 """Extract text content from files using OCR and document parsing."""
 
+import functools
+import logging
+import os
 import pathlib
-import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+# The OCR and imaging libraries are imported where they are used, so
+# callers that never OCR (DOCX, unsupported formats, tooling that only
+# needs the module) don't pay for loading the imaging stack.
+
+# Pages of one PDF rasterized/OCR'd concurrently. poppler and tesseract
+# both run as subprocesses, so threads are enough to use several cores.
+_PDF_PAGE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Process-wide cap on pages/images being rasterized or OCR'd at once.
+# Every intake worker may run its own page lookahead, so without this a
+# bulk drop would start up to intake_workers x _PDF_PAGE_WORKERS jobs
+# (and as many pooled tesserocr engines); with it, one per core.
+_ocr_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+_DEFAULT_OCR_DPI = 300
+
+_log = logging.getLogger("autofiler")
+
+# MuPDF is not thread-safe; page rendering is serialized, OCR is not
+_pymupdf_lock = threading.Lock()
+
+# Idle tesserocr engines, reused across pages and files so the language
+# model is loaded once per engine rather than once per image
+_tess_api_pool: list = []
+_tess_api_lock = threading.Lock()
+
+# tessdata directory next to the configured tesseract executable ("" uses
+# libtesseract's compiled-in prefix); set by _configure_tesseract
+_tessdata_path = ""
+
+# Set once an engine fails to initialise (usually tessdata not found);
+# OCR then stays on pytesseract for the rest of the process
+_tesserocr_failed = False
 
 
 def extract_text(file_path: str, settings: dict) -> str:
     """Dispatch to the appropriate text extractor based on file extension."""
+    return "\n".join(extract_text_pages(file_path, settings))
+
+
+def extract_text_pages(file_path: str, settings: dict) -> Iterator[str]:
+    """
+    Yield the text of a file one page at a time.
+
+    PDFs are rasterized and OCR'd lazily, so a consumer that stops
+    iterating early skips the remaining pages. Other formats yield a
+    single chunk.
+    """
     ext = pathlib.Path(file_path).suffix.lower()
     tesseract_path = settings.get("tesseract_path", "")
     poppler_path = settings.get("poppler_path", "")
-
-    if tesseract_path:
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    dpi = settings.get("ocr_dpi", _DEFAULT_OCR_DPI)
 
     if ext == ".pdf":
-        return extract_pdf_text(file_path, poppler_path)
+        _configure_tesseract(tesseract_path)
+        yield from extract_pdf_pages(file_path, poppler_path, dpi)
     elif ext == ".docx":
-        return extract_docx_text(file_path)
+        yield extract_docx_text(file_path)
     elif ext in (".png", ".jpg", ".jpeg", ".tiff", ".bmp"):
-        return extract_image_text(file_path)
-    else:
-        return ""
+        _configure_tesseract(tesseract_path)
+        yield extract_image_text(file_path)
+
+
+def _configure_tesseract(tesseract_path: str):
+    """
+    Point OCR at the configured tesseract install, if any.
+
+    pytesseract is always configured, since it is the fallback when
+    tesserocr is missing or cannot start; tesserocr engines are given the
+    tessdata directory beside the executable.
+    """
+    global _tessdata_path
+    if not tesseract_path:
+        return
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = tesseract_path
+
+    # Trailing separator: tesserocr's path is used as a directory prefix
+    tessdata = os.path.join(os.path.dirname(tesseract_path), "tessdata", "")
+    if not os.path.isdir(tessdata):
+        tessdata = ""
+    if tessdata != _tessdata_path:
+        with _tess_api_lock:
+            _tessdata_path = tessdata
+            # Engines loaded from the old tessdata are dropped
+            _tess_api_pool.clear()
+
+
+@functools.lru_cache(maxsize=None)
+def _tesserocr():
+    """Return the tesserocr module if it is installed, else None."""
+    try:
+        import tesserocr
+    except ImportError:
+        return None
+    return tesserocr
+
+
+@contextmanager
+def _tess_api():
+    """
+    Check out an idle tesserocr engine (creating one if none is free).
+
+    Yields None when tesserocr is not installed or its engine cannot be
+    initialised; the caller then falls back to pytesseract.
+    """
+    global _tesserocr_failed
+    tesserocr = _tesserocr()
+    if tesserocr is None or _tesserocr_failed:
+        yield None
+        return
+
+    with _tess_api_lock:
+        api = _tess_api_pool.pop() if _tess_api_pool else None
+        path = _tessdata_path
+    if api is None:
+        try:
+            api = (tesserocr.PyTessBaseAPI(path=path) if path
+                   else tesserocr.PyTessBaseAPI())
+        except RuntimeError:
+            _tesserocr_failed = True
+            yield None
+            return
+    try:
+        yield api
+    finally:
+        with _tess_api_lock:
+            if path == _tessdata_path:
+                _tess_api_pool.append(api)
 
 
-def extract_pdf_text(file_path: str, poppler_path: str) -> str:
-    """Convert PDF pages to images at 300 DPI, then OCR each page."""
+def _ocr(image) -> str:
+    """
+    OCR a PIL image or an image file path.
+
+    Uses a pooled in-process tesserocr engine when available; otherwise
+    pytesseract, which runs one tesseract subprocess per call.
+    """
+    with _tess_api() as api:
+        if api is not None:
+            if isinstance(image, str):
+                api.SetImageFile(image)
+            else:
+                api.SetImage(image)
+            return api.GetUTF8Text()
+
+    import pytesseract
+    return pytesseract.image_to_string(image)
+
+
+@functools.lru_cache(maxsize=None)
+def _pymupdf():
+    """Return the fitz module if PyMuPDF is installed, else None."""
     try:
-        kwargs = {"dpi": 300}
+        import fitz
+    except ImportError:
+        return None
+    return fitz
+
+
+def extract_pdf_text(
+    file_path: str, poppler_path: str, dpi: int = _DEFAULT_OCR_DPI
+) -> str:
+    """Convert PDF pages to images, then OCR each page."""
+    return "\n".join(extract_pdf_pages(file_path, poppler_path, dpi))
+
+
+def extract_pdf_pages(
+    file_path: str, poppler_path: str, dpi: int = _DEFAULT_OCR_DPI
+) -> Iterator[str]:
+    """
+    Rasterize and OCR a PDF, yielding page text in order.
+
+    Pages are rendered in-process with PyMuPDF when it is installed,
+    otherwise with poppler via pdf2image. Up to _PDF_PAGE_WORKERS pages
+    are processed ahead of the consumer, all drawing on the shared
+    _ocr_slots; if it stops early, pages not yet started are cancelled.
+    A page that fails ends the text there, with a warning logged.
+    """
+    fitz = _pymupdf()
+    doc = None
+    if fitz is not None:
+        try:
+            with _pymupdf_lock:
+                doc = fitz.open(file_path)
+                page_count = doc.page_count
+        except Exception:
+            return
+        render = functools.partial(_render_page_pymupdf, doc, dpi)
+    else:
+        from pdf2image import pdfinfo_from_path
+
+        kwargs = {}
         if poppler_path:
             kwargs["poppler_path"] = poppler_path
-        images = convert_from_path(file_path, **kwargs)
-        text_parts = []
-        for page_img in images:
-            text_parts.append(pytesseract.image_to_string(page_img))
-        return "\n".join(text_parts)
-    except Exception:
-        return ""
+        try:
+            page_count = pdfinfo_from_path(file_path, **kwargs)["Pages"]
+        except Exception:
+            return
+        render = functools.partial(_render_page_poppler, file_path, dpi, kwargs)
+
+    workers = min(_PDF_PAGE_WORKERS, page_count)
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if pool is None:
+            for page in range(1, page_count + 1):
+                try:
+                    text = _ocr_pdf_page(render, page)
+                except Exception as e:
+                    _log_page_failure(file_path, page, page_count, e)
+                    return
+                yield text
+            return
+
+        pending = deque()
+        next_page = 1
+        while next_page <= page_count or pending:
+            while next_page <= page_count and len(pending) < workers:
+                pending.append(
+                    (next_page, pool.submit(_ocr_pdf_page, render, next_page))
+                )
+                next_page += 1
+            page, future = pending.popleft()
+            try:
+                text = future.result()
+            except Exception as e:
+                _log_page_failure(file_path, page, page_count, e)
+                return
+            yield text
+    finally:
+        if pool is not None:
+            # Cancel pages not yet started and wait for the running ones
+            # (at most workers - 1), so they release their OCR slots and
+            # finish rendering before the document is closed
+            pool.shutdown(wait=True, cancel_futures=True)
+        if doc is not None:
+            with _pymupdf_lock:
+                doc.close()
+
+
+def _log_page_failure(file_path: str, page: int, page_count: int, exc):
+    """Record that a PDF's text stops short because a page failed."""
+    _log.warning(
+        f"OCR failed on page {page}/{page_count} of {file_path}; "
+        f"using text from the first {page - 1} page(s) only: {exc}"
+    )
+
+
+def _ocr_pdf_page(render: Callable[[int, str], list[str]], page: int) -> str:
+    """
+    Rasterize one PDF page (1-based) and OCR it.
+
+    The bitmap is written to a temp file that tesseract reads directly,
+    so the page is never decoded into a PIL image in this process and
+    memory stays flat regardless of page count.
+    """
+    with _ocr_slots, \
+            tempfile.TemporaryDirectory(prefix="autofiler_ocr_") as tmpdir:
+        image_paths = render(page, tmpdir)
+        return "\n".join(_ocr(p) for p in image_paths)
+
+
+def _render_page_poppler(
+    file_path: str, dpi: int, kwargs: dict, page: int, tmpdir: str
+) -> list[str]:
+    from pdf2image import convert_from_path
+
+    return convert_from_path(
+        file_path, dpi=dpi, first_page=page, last_page=page,
+        output_folder=tmpdir, paths_only=True, **kwargs
+    )
+
+
+def _render_page_pymupdf(doc, dpi: int, page: int, tmpdir: str) -> list[str]:
+    out = os.path.join(tmpdir, f"page{page}.ppm")
+    with _pymupdf_lock:
+        pix = doc.load_page(page - 1).get_pixmap(dpi=dpi)
+        pix.save(out)
+    return [out]
 
 
 def extract_docx_text(file_path: str) -> str:
@@ -52,9 +304,12 @@ def extract_docx_text(file_path: str) -> str:
 
 
 def extract_image_text(file_path: str) -> str:
-    """OCR an image file directly using pytesseract."""
+    """OCR an image file directly."""
+    from PIL import Image
+
     try:
         img = Image.open(file_path)
-        return pytesseract.image_to_string(img)
+        with _ocr_slots:
+            return _ocr(img)
     except Exception:
         return ""
@@ -1,52 +1,349 @@
 # src/content_matcher.py
 """Match extracted text against document type keyword and pattern definitions."""
 
+import bisect
 import re
+import threading
 
+from src.derived_cache import get_derived
 
-def match_keywords(text: str, type_definitions: dict) -> dict:
+try:
+    import ahocorasick  # optional: pyahocorasick, single-pass keyword scan
+except ImportError:
+    ahocorasick = None
+
+try:
+    from re import _parser as _sre_parse, _constants as _sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_constants
+
+try:
+    import hyperscan  # optional: multi-pattern prefilter in one pass
+except ImportError:
+    hyperscan = None
+
+# Shortest literal worth checking before running a pattern
+_MIN_PREFILTER_LITERAL = 3
+
+# Python's \s also matches these on ASCII input; Hyperscan's does not
+_HS_UNSAFE_CHARS = re.compile(r"[\x1c-\x1f]")
+
+
+class _HyperscanFilter:
+    """
+    One Hyperscan database over a list of regexes, compiled in prefilter
+    mode: scan() returns a superset of the indexes whose pattern matches,
+    and Python ``re`` confirms each hit.
+    """
+
+    def __init__(self, patterns: list[str], flags: int):
+        hs_flags = (
+            hyperscan.HS_FLAG_PREFILTER
+            | hyperscan.HS_FLAG_SINGLEMATCH
+            | hyperscan.HS_FLAG_ALLOWEMPTY
+        )
+        if flags & re.IGNORECASE:
+            hs_flags |= hyperscan.HS_FLAG_CASELESS
+        if flags & re.MULTILINE:
+            hs_flags |= hyperscan.HS_FLAG_MULTILINE
+        self._db = hyperscan.Database()
+        self._db.compile(
+            expressions=[p.encode("utf-8") for p in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hs_flags] * len(patterns),
+        )
+        # A database's scratch space supports one scan at a time
+        self._lock = threading.Lock()
+
+    def scan(self, text: str) -> set[int] | None:
+        """
+        Indexes of patterns that may match *text*, or None when the text
+        is outside what the prefilter is exact for (non-ASCII).
+        """
+        if not text.isascii() or _HS_UNSAFE_CHARS.search(text):
+            return None
+        hits = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            hits.add(pattern_id)
+
+        with self._lock:
+            self._db.scan(text.encode("ascii"), match_event_handler=on_match)
+        return hits
+
+
+def _hyperscan_filter(patterns: list[str], flags: int) -> _HyperscanFilter | None:
+    """Build a prefilter for *patterns*, or None if unavailable/unsupported."""
+    if hyperscan is None or not patterns:
+        return None
+    try:
+        return _HyperscanFilter(patterns, flags)
+    except Exception:
+        return None
+
+
+class TextBundle:
+    """
+    Extracted text plus derived forms, each computed at most once.
+
+    Matchers accept either a plain string or a bundle; passing one bundle
+    through classification, extraction and entity resolution avoids
+    re-lowercasing and re-splitting the same OCR text.
+    """
+
+    __slots__ = ("raw", "_lower", "_lines", "_line_index")
+
+    def __init__(self, raw: str, lower: str | None = None):
+        self.raw = raw
+        self._lower = lower
+        self._lines = None
+        self._line_index = None
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.raw.lower()
+        return self._lower
+
+    @property
+    def lines(self) -> list[str]:
+        if self._lines is None:
+            self._lines = self.line_index[0]
+        return self._lines
+
+    @property
+    def line_index(self) -> tuple[list[str], list[int]]:
+        """(lines, start offset of each line); see _line_index()."""
+        if self._line_index is None:
+            self._line_index = _line_index(self.raw)
+        return self._line_index
+
+
+def as_text_bundle(text) -> TextBundle:
+    """Wrap a string in a TextBundle; bundles are returned unchanged."""
+    if isinstance(text, TextBundle):
+        return text
+    return TextBundle(text)
+
+
+def _compile_all(patterns: list[str], flags: int) -> list[re.Pattern]:
+    """Compile patterns, silently dropping any that are not valid regex."""
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern, flags))
+        except re.error:
+            continue
+    return compiled
+
+
+def _required_literal(pattern: str) -> str | None:
+    """
+    Return a lowercased literal that every match of *pattern* must contain.
+
+    Takes the longest run of plain characters in the pattern's top-level
+    sequence (no alternation or optional parts involved). Returns None if
+    there is no such run of at least _MIN_PREFILTER_LITERAL characters.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except Exception:
+        return None
+    best = ""
+    run = []
+    for op, av in list(parsed) + [(None, None)]:
+        if op is _sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    if len(best) < _MIN_PREFILTER_LITERAL:
+        return None
+    return best.lower()
+
+
+def _build_content_patterns(type_definitions: dict) -> list[tuple]:
+    """
+    Deduplicate content_patterns across all types.
+
+    Returns [(compiled_pattern, required_literal, [owning type names]), ...]
+    so each distinct regex is searched once per text and credited to every
+    type using it; required_literal is from _required_literal().
+    """
+    owners: dict[str, list[str]] = {}
+    for type_name, typedef in type_definitions.get("types", {}).items():
+        for pattern in typedef.get("content_patterns", []):
+            owners.setdefault(pattern, []).append(type_name)
+
+    index = []
+    for pattern, type_names in owners.items():
+        compiled = _compile_all([pattern], re.IGNORECASE)
+        if compiled:
+            index.append((compiled[0], _required_literal(pattern), type_names))
+    return index
+
+
+def _build_content_filter(type_definitions: dict) -> _HyperscanFilter | None:
+    """Hyperscan prefilter aligned with the _build_content_patterns index."""
+    index = get_derived(
+        type_definitions, "content_patterns", _build_content_patterns
+    )
+    return _hyperscan_filter(
+        [pattern.pattern for pattern, _, _ in index], re.IGNORECASE
+    )
+
+
+def _build_keyword_index(type_definitions: dict) -> tuple[list, dict, object]:
+    """
+    Deduplicate content_keywords (case-folded) across all types.
+
+    Returns ([(keyword_lower, [owning type names]), ...],
+             {type_name: keyword_threshold},
+             automaton) — the automaton is an Aho-Corasick matcher over
+    the keyword list when pyahocorasick is installed, else None.
+    """
+    owners: dict[str, list[str]] = {}
+    thresholds = {}
+    for type_name, typedef in type_definitions.get("types", {}).items():
+        thresholds[type_name] = typedef.get("keyword_threshold", 1)
+        for kw in typedef.get("content_keywords", []):
+            owners.setdefault(kw.lower(), []).append(type_name)
+    keywords = list(owners.items())
+
+    automaton = None
+    if ahocorasick is not None and any(kw for kw, _ in keywords):
+        automaton = ahocorasick.Automaton()
+        for i, (kw, _) in enumerate(keywords):
+            if kw:
+                automaton.add_word(kw, i)
+        automaton.make_automaton()
+    return keywords, thresholds, automaton
+
+
+def _build_extraction_filters(type_definitions: dict) -> dict:
+    """
+    {type_name: (_HyperscanFilter | None, {field_name: first index})}.
+
+    Each type's extraction patterns are numbered in field order so a
+    single scan covers every field of the type.
+    """
+    compiled = get_derived(
+        type_definitions, "extraction_patterns", _build_extraction_patterns
+    )
+    filters = {}
+    for type_name, fields in compiled.items():
+        offsets = {}
+        flat = []
+        for field_name, patterns in fields.items():
+            offsets[field_name] = len(flat)
+            flat.extend(p.pattern for p in patterns)
+        filters[type_name] = (
+            _hyperscan_filter(flat, re.IGNORECASE | re.MULTILINE), offsets
+        )
+    return filters
+
+
+def _build_extraction_patterns(type_definitions: dict) -> dict:
+    """{type_name: {field_name: [compiled patterns]}} for every type."""
+    return {
+        type_name: {
+            field_name: _compile_all(
+                field_cfg.get("patterns", []), re.IGNORECASE | re.MULTILINE
+            )
+            for field_name, field_cfg in typedef.get(
+                "extraction_fields", {}
+            ).items()
+        }
+        for type_name, typedef in type_definitions.get("types", {}).items()
+    }
+
+
+def _found_keywords(keywords: list, automaton, text_lower: str) -> set[int]:
+    """Indexes into *keywords* of every keyword occurring in *text_lower*."""
+    if automaton is not None:
+        # One pass over the text finds every keyword present
+        found = {i for _, i in automaton.iter(text_lower)}
+        found.update(i for i, (kw, _) in enumerate(keywords) if not kw)
+        return found
+    return {i for i, (kw, _) in enumerate(keywords) if kw in text_lower}
+
+
+def keywords_in_text(text_lower: str, type_definitions: dict) -> set[str]:
+    """Case-folded content_keywords, from any type, that occur in *text_lower*."""
+    keywords, _, automaton = get_derived(
+        type_definitions, "keyword_index", _build_keyword_index
+    )
+    return {keywords[i][0] for i in _found_keywords(keywords, automaton, text_lower)}
+
+
+def match_keywords(
+    text: str, type_definitions: dict, text_lower: str | None = None
+) -> dict:
     """
     Check extracted text for keywords defined in each type.
 
+    Pass *text_lower* when the caller already holds ``text.lower()``
+    to skip case-folding the text again.
+
     Returns:
         {type_name: count_of_matched_keywords} for types
         that meet or exceed their keyword_threshold.
     """
-    text_lower = text.lower()
-    matches = {}
-    for type_name, typedef in type_definitions.get("types", {}).items():
-        keywords = typedef.get("content_keywords", [])
-        threshold = typedef.get("keyword_threshold", 1)
-        count = sum(1 for kw in keywords if kw.lower() in text_lower)
-        if count >= threshold:
-            matches[type_name] = count
-    return matches
+    keywords, thresholds, automaton = get_derived(
+        type_definitions, "keyword_index", _build_keyword_index
+    )
+    if text_lower is None:
+        text_lower = text.lower()
+    found = _found_keywords(keywords, automaton, text_lower)
+
+    counts = dict.fromkeys(thresholds, 0)
+    for i in found:
+        for type_name in keywords[i][1]:
+            counts[type_name] += 1
+    return {
+        type_name: count
+        for type_name, count in counts.items()
+        if count >= thresholds[type_name]
+    }
+
 
+# Label pattern: "Word(s): text" — signals a new field, not continuation
+_ADDRESS_LABEL_RE = re.compile(r"^[A-Za-z][A-Za-z ]{0,30}:\s")
 
-def _extract_address_lines(text: str, match: re.Match) -> str:
+
+def _line_index(text: str) -> tuple[list[str], list[int]]:
+    """Return (text.splitlines(), start offset of each line)."""
+    starts = []
+    pos = 0
+    for raw in text.splitlines(keepends=True):
+        starts.append(pos)
+        pos += len(raw)
+    return text.splitlines(), starts
+
+
+def _extract_address_lines(
+    text: str, match: re.Match, line_index: tuple | None = None
+) -> str:
     """Grab continuation lines after an initial address match.
 
     Starting from the matched line, collects subsequent lines that look like
     address continuations (not blank, not a new label like ``Word: value``).
     Stops after 4 continuation lines or when a stop condition is hit.
     Returns the full address joined with ", ".
+
+    *line_index* is ``_line_index(text)``; callers resolving several
+    matches against the same text should build it once and pass it in.
     """
     first_value = match.group(1).strip()
-    lines = text.splitlines()
-    match_start = match.start()
+    if line_index is None:
+        line_index = _line_index(text)
+    lines, starts = line_index
 
     # Find which line the match is on
-    pos = 0
-    start_idx = 0
-    for i, line in enumerate(lines):
-        end = pos + len(line)
-        if pos <= match_start <= end:
-            start_idx = i
-            break
-        pos = end + 1  # +1 for the newline character
-
-    # Label pattern: "Word(s): text" — signals a new field, not continuation
-    label_re = re.compile(r"^[A-Za-z][A-Za-z ]{0,30}:\s")
+    start_idx = max(bisect.bisect_right(starts, match.start()) - 1, 0)
 
     parts = []
     if first_value:
@@ -57,17 +354,17 @@ def _extract_address_lines(text: str, match: re.Match) -> str:
         stripped = line.strip()
         if not stripped:
             break
-        if label_re.match(stripped):
+        if _ADDRESS_LABEL_RE.match(stripped):
             break
         parts.append(stripped)
 
     return ", ".join(parts)
 
 
-def extract_fields(text: str, type_name: str, type_definitions: dict) -> tuple[dict, list]:
+def extract_fields(text, type_name: str, type_definitions: dict) -> tuple[dict, list]:
     """
-    Extract named fields from text using regex patterns defined in a type's
-    extraction_fields config.
+    Extract named fields from text (a str or TextBundle) using regex
+    patterns defined in a type's extraction_fields config.
 
     Each field has an ordered list of regex patterns (first match wins)
     and a ``required`` flag.
@@ -82,25 +379,43 @@ def extract_fields(text: str, type_name: str, type_definitions: dict) -> tuple[d
     if not field_defs:
         return {}, []
 
+    bundle = as_text_bundle(text)
+    text = bundle.raw
+
+    compiled_fields = get_derived(
+        type_definitions, "extraction_patterns", _build_extraction_patterns
+    )[type_name]
+
+    hits = None
+    if hyperscan is not None:
+        hs_filter, offsets = get_derived(
+            type_definitions, "extraction_filters", _build_extraction_filters
+        )[type_name]
+        if hs_filter is not None:
+            hits = hs_filter.scan(text)
+
     extracted = {}
     missing = []
 
     for field_name, field_cfg in field_defs.items():
-        patterns = field_cfg.get("patterns", [])
         required = field_cfg.get("required", False)
         field_type = field_cfg.get("field_type", "text")
         value = None
 
-        for pattern in patterns:
+        for i, pattern in enumerate(compiled_fields[field_name]):
+            if hits is not None and offsets[field_name] + i not in hits:
+                continue  # prefilter proved no match
             try:
-                match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+                match = pattern.search(text)
                 if match:
                     if field_type == "address":
-                        value = _extract_address_lines(text, match)
+                        value = _extract_address_lines(
+                            text, match, bundle.line_index
+                        )
                     else:
                         value = match.group(1).strip()
                     break
-            except (re.error, IndexError):
+            except IndexError:
                 continue
 
         if value:
@@ -111,23 +426,64 @@ def extract_fields(text: str, type_name: str, type_definitions: dict) -> tuple[d
     return extracted, missing
 
 
-def match_patterns(text: str, type_definitions: dict) -> dict:
+def match_patterns(
+    text: str, type_definitions: dict, text_lower: str | None = None
+) -> dict:
     """
     Check extracted text against regex patterns defined in each type.
 
+    For ASCII text, patterns are first screened in one pass by Hyperscan
+    when it is installed, otherwise by checking each pattern's required
+    literal against the lowercased text; screened-out patterns never run
+    the regex. Pass
+    *text_lower* when the caller already holds ``text.lower()``.
+
     Returns:
         {type_name: count_of_matched_patterns}.
     """
+    index = get_derived(
+        type_definitions, "content_patterns", _build_content_patterns
+    )
+    hits = None
+    if hyperscan is not None:
+        hs_filter = get_derived(
+            type_definitions, "content_filter", _build_content_filter
+        )
+        if hs_filter is not None:
+            hits = hs_filter.scan(text)
+
+    # Case-insensitive regex matching and str.lower() agree on ASCII only
+    prefilter = hits is None and text.isascii()
+    if prefilter and text_lower is None:
+        text_lower = text.lower()
+
     matches = {}
-    for type_name, typedef in type_definitions.get("types", {}).items():
-        patterns = typedef.get("content_patterns", [])
-        count = 0
-        for pattern in patterns:
-            try:
-                if re.search(pattern, text, re.IGNORECASE):
-                    count += 1
-            except re.error:
+    for i, (pattern, literal, type_names) in enumerate(index):
+        if hits is not None:
+            if i not in hits:
                 continue
-        if count > 0:
-            matches[type_name] = count
+        elif prefilter and literal is not None and literal not in text_lower:
+            continue
+        if pattern.search(text):
+            for type_name in type_names:
+                matches[type_name] = matches.get(type_name, 0) + 1
     return matches
+
+
+def analyze_text(text, type_definitions: dict) -> dict:
+    """
+    Run keyword and content-pattern matching over one case-folded copy
+    of the text (a str or TextBundle).
+
+    Returns:
+        {"keyword_matches": {...}, "pattern_matches": {...}}
+    """
+    bundle = as_text_bundle(text)
+    return {
+        "keyword_matches": match_keywords(
+            bundle.raw, type_definitions, bundle.lower
+        ),
+        "pattern_matches": match_patterns(
+            bundle.raw, type_definitions, bundle.lower
+        ),
+    }
@@ -1,9 +1,10 @@
 # src/cross_referencer.py
 """Generic, config-driven field cross-referencing."""
 
-import re
 from datetime import datetime
 
+from src.config_learner import _generate_entity_key
+from src.derived_cache import invalidate
 from src.fuzzy_matcher import fuzzy_match_with_support
 
 
@@ -22,7 +23,7 @@ def _build_new_entry(
     Returns:
         (key, entry_dict) where key is a slug of the raw value.
     """
-    key = re.sub(r"[^a-z0-9]+", "_", raw_value.lower()).strip("_")
+    key = _generate_entity_key(raw_value)
 
     entry = {
         "name": raw_value,
@@ -56,7 +57,7 @@ def cross_reference_fields(
     2. Build supporting values from other extracted fields
     3. Call fuzzy_match_with_support() with the layered lookup
     4. Match found -> substitute canonical value
-    5. No match + create_if_missing -> create new entry, save, log
+    5. No match + create_if_missing -> create new entry, queue save, log
     6. No match + not create_if_missing -> add to unresolved, log failure
 
     Args:
@@ -115,7 +116,8 @@ def cross_reference_fields(
                 raw_value, extracted_fields, field_cfg, all_field_defs
             )
             ref_data.setdefault(ref_key, {})[new_key] = new_entry
-            config.save_reference(ref_path, ref_data)
+            invalidate(entries, "fuzzy_candidates")
+            config.queue_reference_update(ref_path, ref_data)
             if logger:
                 logger.log_reference_entry(field_name, raw_value, new_entry)
         else:
@@ -35,18 +35,25 @@ def export_reference(
         exports_dir.mkdir(parents=True, exist_ok=True)
         output_path = str(exports_dir / output_filename)
 
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-        writer.writeheader()
-        for key, entry in entries.items():
-            row = {"key": key}
-            row.update(entry)
-            row["aliases"] = ";".join(entry.get("aliases", []))
-            writer.writerow(row)
+    columns = tuple(fieldnames)
+    with open(
+        output_path, "w", newline="", encoding="utf-8", buffering=1 << 20
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(
+            _row_values(key, entry, columns) for key, entry in entries.items()
+        )
 
     return output_path
 
 
+def _row_values(key: str, entry: dict, columns: tuple) -> list:
+    """One CSV row: entry fields plus key, aliases joined with ';'."""
+    row = {"key": key, **entry, "aliases": ";".join(entry.get("aliases", []))}
+    return [row.get(column, "") for column in columns]
+
+
 def export_vendor_reference(config, output_path: str | None = None) -> str:
     """Export vendor_reference.json to CSV."""
     return export_reference(
@@ -0,0 +1,47 @@
+# src/derived_cache.py
+"""Memoize data derived from loaded config dicts (compiled regexes, indexes)."""
+
+import threading
+from collections import OrderedDict
+
+# Entries kept across all kinds; a config reload produces a new dict object
+_MAX_ENTRIES = 64
+
+_cache: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_derived(source, kind: str, builder):
+    """
+    Return ``builder(source)``, computed once per *source* object and *kind*.
+
+    Entries are keyed on object identity and keep a reference to *source*,
+    so an id cannot be reused while its entry is cached.  Reloaded config
+    files are new objects and rebuild automatically; code that mutates a
+    source in place must call invalidate() afterwards.
+    """
+    key = (id(source), kind)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] is source:
+            _cache.move_to_end(key)
+            return entry[1]
+
+    value = builder(source)
+    with _lock:
+        _cache[key] = (source, value)
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return value
+
+
+def invalidate(source, kind: str | None = None):
+    """Drop derived entries built from *source* (only *kind*, if given)."""
+    with _lock:
+        stale = [
+            key for key, entry in _cache.items()
+            if entry[0] is source and (kind is None or key[1] == kind)
+        ]
+        for key in stale:
+            del _cache[key]
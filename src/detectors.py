@@ -3,8 +3,45 @@
 
 import os
 import pathlib
+import threading
+import time
 import magic
-from datetime import datetime
+
+from src.derived_cache import get_derived
+
+# Bytes of file header handed to libmagic; large enough for it to look
+# past the zip header and tell OOXML documents from plain archives
+_MAGIC_BUFFER_SIZE = 64 * 1024
+
+_magic_instance = None
+_magic_lock = threading.Lock()
+
+
+def _get_magic() -> "magic.Magic":
+    """Return the shared MIME-mode Magic instance (loading the DB once)."""
+    global _magic_instance
+    if _magic_instance is None:
+        with _magic_lock:
+            if _magic_instance is None:
+                _magic_instance = magic.Magic(mime=True)
+    return _magic_instance
+
+
+def detect_all(file_path: str) -> dict:
+    """
+    Run extension, MIME, and metadata detection with one stat and one read.
+
+    Returns:
+        {"extension": str, "mime_type": str, "metadata": dict}
+    """
+    with open(file_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        header = f.read(_MAGIC_BUFFER_SIZE)
+    return {
+        "extension": detect_extension(file_path),
+        "mime_type": _get_magic().from_buffer(header),
+        "metadata": _metadata_from_stat(stat),
+    }
 
 
 def detect_extension(file_path: str) -> str:
@@ -14,32 +51,53 @@ def detect_extension(file_path: str) -> str:
 
 def detect_mime(file_path: str) -> str:
     """Return the MIME type string detected from file content bytes."""
-    return magic.from_file(file_path, mime=True)
+    return _get_magic().from_file(file_path)
+
+
+def _build_format_index(type_definitions: dict, field: str) -> dict[str, list[str]]:
+    """{value: [type names listing it in *field*]}, in type order."""
+    index: dict[str, list[str]] = {}
+    for type_name, typedef in type_definitions.get("types", {}).items():
+        for value in typedef.get(field, []):
+            owners = index.setdefault(value, [])
+            if not owners or owners[-1] != type_name:
+                owners.append(type_name)
+    return index
+
+
+def _extension_index(type_definitions: dict) -> dict[str, list[str]]:
+    return _build_format_index(type_definitions, "container_formats")
+
+
+def _mime_index(type_definitions: dict) -> dict[str, list[str]]:
+    return _build_format_index(type_definitions, "mime_types")
 
 
 def match_extension(extension: str, type_definitions: dict) -> list[str]:
     """Return a list of type names whose container_formats list contains the given extension."""
-    matches = []
-    for type_name, typedef in type_definitions.get("types", {}).items():
-        if extension in typedef.get("container_formats", []):
-            matches.append(type_name)
-    return matches
+    index = get_derived(type_definitions, "extension_index", _extension_index)
+    return list(index.get(extension, ()))
 
 
 def match_mime(mime_type: str, type_definitions: dict) -> list[str]:
     """Return a list of type names whose mime_types list contains the given MIME type."""
-    matches = []
-    for type_name, typedef in type_definitions.get("types", {}).items():
-        if mime_type in typedef.get("mime_types", []):
-            matches.append(type_name)
-    return matches
+    index = get_derived(type_definitions, "mime_index", _mime_index)
+    return list(index.get(mime_type, ()))
 
 
 def get_file_metadata(file_path: str) -> dict:
     """Return a dict of file metadata: size, created, modified."""
-    stat = os.stat(file_path)
+    return _metadata_from_stat(os.stat(file_path))
+
+
+def _iso_local(timestamp: float) -> str:
+    """Local time as ISO 8601 to the second, e.g. '2025-01-31T09:15:00'."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp))
+
+
+def _metadata_from_stat(stat: os.stat_result) -> dict:
     return {
         "file_size": stat.st_size,
-        "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        "created": _iso_local(stat.st_ctime),
+        "modified": _iso_local(stat.st_mtime),
     }
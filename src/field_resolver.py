@@ -1,10 +1,18 @@
 # src/field_resolver.py
 """Resolve extracted name fields against a unified entity reference file."""
 
-import re
 from datetime import date
 
-from src.fuzzy_matcher import fuzzy_match
+from src.config_learner import _generate_entity_key
+from src.config_loader import lock_for
+from src.content_matcher import as_text_bundle
+from src.derived_cache import get_derived, invalidate
+from src.fuzzy_matcher import best_line_match, fuzzy_match
+
+try:
+    import ahocorasick  # optional: pyahocorasick, single-pass name scan
+except ImportError:
+    ahocorasick = None
 
 REF_PATH = "References/fieldname_ref.json"
 
@@ -12,7 +20,7 @@ REF_PATH = "References/fieldname_ref.json"
 def resolve_fields(
     extracted_fields: dict,
     missing_fields: list,
-    extracted_text: str,
+    extracted_text,
     type_name: str,
     config,
     logger=None,
@@ -26,6 +34,8 @@ def resolve_fields(
       - Scenario B (regex missed): scan OCR text for known entity names.
         Found → fill in the field. Not found → field stays missing.
 
+    *extracted_text* may be a str or a TextBundle.
+
     Returns:
         (resolved_fields, still_missing, resolution_info)
     """
@@ -34,110 +44,112 @@ def resolve_fields(
     field_defs = typedef.get("extraction_fields", {})
     doc_type_code = typedef.get("code", "000")
 
-    reference_entries = config.load_reference(REF_PATH)
-    resolved_fields = dict(extracted_fields)
-    still_missing = list(missing_fields)
-    resolution_info: dict = {}
-    ref_changed = False
-
-    for field_name, field_cfg in field_defs.items():
-        lookup = field_cfg.get("reference_lookup")
-        if not lookup:
-            continue
-
-        role = lookup["role"]
-
-        # Pre-filter entries by role for this field
-        if role:
-            role_filtered = {
-                k: v for k, v in reference_entries.items()
-                if role in v.get("roles", [])
-            }
-        else:
-            role_filtered = reference_entries
-
-        if field_name in extracted_fields:
-            # Scenario A — regex got a value
-            raw_value = extracted_fields[field_name]
-            matched_key, ratio = fuzzy_match(
-                raw_value, role_filtered, threshold=0.80
-            )
-
-            if matched_key:
-                canonical = reference_entries[matched_key]["name"]
-                resolved_fields[field_name] = canonical
-                _update_entity_metadata(
-                    reference_entries[matched_key], role, doc_type_code
+    # Intake workers resolve concurrently; serialize reference read-modify-write
+    with lock_for(REF_PATH):
+        reference_entries = config.load_reference(REF_PATH)
+        resolved_fields = dict(extracted_fields)
+        still_missing = list(missing_fields)
+        resolution_info: dict = {}
+        ref_changed = False
+
+        for field_name, field_cfg in field_defs.items():
+            lookup = field_cfg.get("reference_lookup")
+            if not lookup:
+                continue
+
+            role = lookup["role"]
+
+            # Pre-filter entries by role for this field
+            role_filtered = _entries_for_role(reference_entries, role)
+
+            if field_name in extracted_fields:
+                # Scenario A — regex got a value
+                raw_value = extracted_fields[field_name]
+                matched_key, ratio = fuzzy_match(
+                    raw_value, role_filtered, threshold=0.80
                 )
-                ref_changed = True
-                resolution_info[field_name] = {
-                    "method": "fuzzy_match",
-                    "raw_value": raw_value,
-                    "resolved_value": canonical,
-                    "entity_key": matched_key,
-                    "ratio": round(ratio, 4),
-                }
-                if logger:
-                    logger.log_field_resolved(
-                        field_name, "fuzzy_match", raw_value, canonical, ratio
+
+                if matched_key:
+                    canonical = reference_entries[matched_key]["name"]
+                    resolved_fields[field_name] = canonical
+                    if _update_entity_metadata(
+                        reference_entries[matched_key], role, doc_type_code
+                    ):
+                        invalidate(reference_entries, "role_index")
+                        ref_changed = True
+                    resolution_info[field_name] = {
+                        "method": "fuzzy_match",
+                        "raw_value": raw_value,
+                        "resolved_value": canonical,
+                        "entity_key": matched_key,
+                        "ratio": round(ratio, 4),
+                    }
+                    if logger:
+                        logger.log_field_resolved(
+                            field_name, "fuzzy_match", raw_value, canonical, ratio
+                        )
+                else:
+                    # Auto-create new entity
+                    entity_key, entity_dict = create_entity(
+                        raw_value, role, doc_type_code, reference_entries
                     )
-            else:
-                # Auto-create new entity
-                entity_key, entity_dict = create_entity(
-                    raw_value, role, doc_type_code, reference_entries
+                    reference_entries[entity_key] = entity_dict
+                    invalidate(reference_entries, "role_index")
+                    invalidate(reference_entries, "entity_automaton")
+                    invalidate(reference_entries, "fuzzy_candidates")
+                    ref_changed = True
+                    resolution_info[field_name] = {
+                        "method": "auto_created",
+                        "raw_value": raw_value,
+                        "resolved_value": raw_value,
+                        "entity_key": entity_key,
+                        "ratio": 1.0,
+                    }
+                    if logger:
+                        logger.log_field_resolved(
+                            field_name, "auto_created", raw_value, raw_value, 1.0
+                        )
+
+            elif field_name in missing_fields:
+                # Scenario B — regex missed, scan OCR text (role-filtered)
+                matched_key, canonical, confidence = scan_text_for_entities(
+                    extracted_text, reference_entries, threshold=0.95,
+                    role=role,
                 )
-                reference_entries[entity_key] = entity_dict
-                ref_changed = True
-                resolution_info[field_name] = {
-                    "method": "auto_created",
-                    "raw_value": raw_value,
-                    "resolved_value": raw_value,
-                    "entity_key": entity_key,
-                    "ratio": 1.0,
-                }
-                if logger:
-                    logger.log_field_resolved(
-                        field_name, "auto_created", raw_value, raw_value, 1.0
-                    )
 
-        elif field_name in missing_fields:
-            # Scenario B — regex missed, scan OCR text (role-filtered)
-            matched_key, canonical, confidence = scan_text_for_entities(
-                extracted_text, reference_entries, threshold=0.95,
-                role=role,
-            )
-
-            if matched_key:
-                resolved_fields[field_name] = canonical
-                still_missing.remove(field_name)
-                _update_entity_metadata(
-                    reference_entries[matched_key], role, doc_type_code
-                )
-                ref_changed = True
-                resolution_info[field_name] = {
-                    "method": "text_scan",
-                    "raw_value": None,
-                    "resolved_value": canonical,
-                    "entity_key": matched_key,
-                    "ratio": round(confidence, 4),
-                }
-                if logger:
-                    logger.log_field_resolved(
-                        field_name, "text_scan", "", canonical, confidence
-                    )
-            else:
-                resolution_info[field_name] = {
-                    "method": "unresolved",
-                    "raw_value": None,
-                    "resolved_value": None,
-                    "entity_key": None,
-                    "ratio": 0.0,
-                }
-                if logger:
-                    logger.log_field_unresolved(field_name, type_name)
-
-    if ref_changed:
-        config.save_reference(REF_PATH, reference_entries)
+                if matched_key:
+                    resolved_fields[field_name] = canonical
+                    still_missing.remove(field_name)
+                    if _update_entity_metadata(
+                        reference_entries[matched_key], role, doc_type_code
+                    ):
+                        invalidate(reference_entries, "role_index")
+                        ref_changed = True
+                    resolution_info[field_name] = {
+                        "method": "text_scan",
+                        "raw_value": None,
+                        "resolved_value": canonical,
+                        "entity_key": matched_key,
+                        "ratio": round(confidence, 4),
+                    }
+                    if logger:
+                        logger.log_field_resolved(
+                            field_name, "text_scan", "", canonical, confidence
+                        )
+                else:
+                    resolution_info[field_name] = {
+                        "method": "unresolved",
+                        "raw_value": None,
+                        "resolved_value": None,
+                        "entity_key": None,
+                        "ratio": 0.0,
+                    }
+                    if logger:
+                        logger.log_field_unresolved(field_name, type_name)
+
+        if ref_changed:
+            # Written by config.flush_references() once the batch settles
+            config.queue_reference_update(REF_PATH, reference_entries)
 
     return resolved_fields, still_missing, resolution_info
 
@@ -158,62 +170,108 @@ def scan_text_for_entities(
     that role are considered.  This prevents a customer entity from being
     matched when scanning for a vendor field (and vice-versa).
 
+    *text* may be a str or a TextBundle.
+
     Returns:
         (matched_key, canonical_name, confidence) or (None, None, 0.0)
     """
-    if not text or not reference_entries:
+    bundle = as_text_bundle(text)
+    if not bundle.raw or not reference_entries:
         return None, None, 0.0
 
     # Pre-filter entries by role when specified
-    if role:
-        filtered = {
-            k: v for k, v in reference_entries.items()
-            if role in v.get("roles", [])
-        }
-    else:
-        filtered = reference_entries
+    filtered = _entries_for_role(reference_entries, role)
 
     if not filtered:
         return None, None, 0.0
 
-    text_lower = text.lower()
+    text_lower = bundle.lower
 
     # Pass 1 — substring search (case-insensitive)
-    for key, entry in filtered.items():
-        candidates = [entry.get("name", "")]
-        candidates.extend(entry.get("aliases", []))
+    automaton = None
+    if ahocorasick is not None:
+        automaton = get_derived(
+            reference_entries, "entity_automaton", _build_entity_automaton
+        )
+    if automaton is not None:
+        # One pass over the text; among the entities found, prefer the
+        # earliest in reference order, as the per-entity scan below does
+        best = None
+        for _, owners in automaton.iter(text_lower):
+            for order, key in owners:
+                if (best is None or order < best[0]) and key in filtered:
+                    best = (order, key)
+        if best is not None:
+            return best[1], filtered[best[1]]["name"], 1.0
+    else:
+        for key, entry in filtered.items():
+            candidates = [entry.get("name", "")]
+            candidates.extend(entry.get("aliases", []))
 
-        for candidate in candidates:
-            if not candidate:
-                continue
-            if candidate.lower() in text_lower:
-                return key, entry["name"], 1.0
+            for candidate in candidates:
+                if not candidate:
+                    continue
+                if candidate.lower() in text_lower:
+                    return key, entry["name"], 1.0
 
     # Pass 2 — fuzzy line match
-    lines = text.splitlines()
-    best_key = None
-    best_name = None
-    best_ratio = 0.0
-
-    for line in lines:
-        line_stripped = line.strip()
-        if not line_stripped:
-            continue
-
-        matched_key, ratio = fuzzy_match(
-            line_stripped, filtered, threshold=threshold
-        )
-        if matched_key and ratio > best_ratio:
-            best_key = matched_key
-            best_name = filtered[matched_key]["name"]
-            best_ratio = ratio
-
+    best_key, best_ratio = best_line_match(
+        bundle.lines, filtered, threshold=threshold
+    )
     if best_key:
-        return best_key, best_name, best_ratio
+        return best_key, filtered[best_key]["name"], best_ratio
 
     return None, None, 0.0
 
 
+def _build_role_index(reference_entries: dict) -> dict[str, dict]:
+    """{role: {entity_key: entry}} in reference order."""
+    index: dict[str, dict] = {}
+    for key, entry in reference_entries.items():
+        for role in entry.get("roles", []):
+            index.setdefault(role, {})[key] = entry
+    return index
+
+
+def _entries_for_role(reference_entries: dict, role: str | None) -> dict:
+    """
+    Entries whose ``roles`` contain *role* (all entries if role is empty).
+
+    The returned dict is shared across calls; treat it as read-only.
+    """
+    if not role:
+        return reference_entries
+    index = get_derived(reference_entries, "role_index", _build_role_index)
+    return index.get(role, {})
+
+
+def _build_entity_automaton(reference_entries: dict):
+    """
+    Aho-Corasick automaton over every lowercased entity name and alias.
+
+    Each word maps to [(entry_order, entity_key), ...]; role filtering is
+    applied at scan time so metadata updates don't require a rebuild.
+    Returns None when there are no names to index.
+    """
+    automaton = ahocorasick.Automaton()
+    for order, (key, entry) in enumerate(reference_entries.items()):
+        candidates = [entry.get("name", "")]
+        candidates.extend(entry.get("aliases", []))
+        for candidate in candidates:
+            if not candidate:
+                continue
+            word = candidate.lower()
+            owners = automaton.get(word, None)
+            if owners is None:
+                automaton.add_word(word, [(order, key)])
+            else:
+                owners.append((order, key))
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
 def create_entity(
     raw_value: str,
     role: str,
@@ -246,20 +304,16 @@ def create_entity(
     return entity_key, entity_dict
 
 
-def _generate_entity_key(name: str) -> str:
-    """Slugify a name to a reference key.
+def _update_entity_metadata(entity: dict, role: str, doc_type_code: str) -> bool:
+    """Idempotent append to roles and doc_types lists.
 
-    "William Kruse & Company LLC" -> "william_kruse_company_llc"
+    Returns True if either list changed.
     """
-    slug = name.lower()
-    slug = re.sub(r"[^a-z0-9]+", "_", slug)
-    slug = slug.strip("_")
-    return slug
-
-
-def _update_entity_metadata(entity: dict, role: str, doc_type_code: str):
-    """Idempotent append to roles and doc_types lists."""
+    changed = False
     if role not in entity.get("roles", []):
         entity.setdefault("roles", []).append(role)
+        changed = True
     if doc_type_code not in entity.get("doc_types", []):
         entity.setdefault("doc_types", []).append(doc_type_code)
+        changed = True
+    return changed
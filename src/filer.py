@@ -1,10 +1,33 @@
 # src/filer.py
 """Move classified files to their destination with proper naming."""
 
+import errno
+import os
+import secrets
 import shutil
 import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Characters not allowed in Windows directory names
+_FILENAME_STRIP = str.maketrans("", "", '<>:"/|?*')
+
+# Destination directories already created (or found) by this process
+_ENSURED_DIRS: set[str] = set()
+_ensured_lock = threading.Lock()
+
+
+def _ensure_dir(dest: pathlib.Path):
+    """mkdir -p *dest*, at most once per process per directory."""
+    key = str(dest)
+    with _ensured_lock:
+        if key in _ENSURED_DIRS:
+            return
+    dest.mkdir(parents=True, exist_ok=True)
+    with _ensured_lock:
+        _ENSURED_DIRS.add(key)
+
 
 def resolve_destination(
     type_name: str,
@@ -25,36 +48,60 @@ def resolve_destination(
     if extracted_fields:
         for field_name, field_value in extracted_fields.items():
             # Sanitize field value for use in directory names
-            safe_value = field_value
-            for ch in '<>:"/|?*':
-                safe_value = safe_value.replace(ch, "")
-            subfolder = subfolder.replace(f"{{{field_name}}}", safe_value.strip())
+            safe_value = field_value.translate(_FILENAME_STRIP).strip()
+            subfolder = subfolder.replace(f"{{{field_name}}}", safe_value)
 
     dest = pathlib.Path(destination_root) / subfolder
-    dest.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(dest)
     return dest
 
 
-def resolve_duplicate(target: pathlib.Path) -> pathlib.Path:
+def _claim(path: pathlib.Path) -> bool:
+    """Atomically create an empty placeholder at *path*; False if it exists."""
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    os.close(fd)
+    return True
+
+
+def resolve_duplicate(target: pathlib.Path) -> tuple[pathlib.Path, bool]:
     """
-    If the target path already exists, append a timestamp suffix
-    to make the filename unique.
+    Claim *target*, or a timestamp-suffixed variant if it already exists.
+
+    The chosen path is created empty with O_EXCL, so concurrent filers
+    can never pick the same name; the caller moves the file over it.
+
+    Returns:
+        (claimed_path, duplicate) — duplicate is True when *target* was taken.
     """
-    if not target.exists():
-        return target
+    if _claim(target):
+        return target, False
 
     stem = target.stem
     suffix = target.suffix
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     new_target = target.parent / f"{stem}_{timestamp}{suffix}"
 
-    # Extremely rare: same-second collision
-    counter = 1
-    while new_target.exists():
-        new_target = target.parent / f"{stem}_{timestamp}_{counter}{suffix}"
-        counter += 1
+    # Extremely rare: same-second collision; a random token avoids
+    # probing _1, _2, ... one by one
+    while not _claim(new_target):
+        token = secrets.token_hex(4)
+        new_target = target.parent / f"{stem}_{timestamp}_{token}{suffix}"
 
-    return new_target
+    return new_target, True
+
+
+def _move(src: str, dst: pathlib.Path):
+    """Rename *src* over *dst*, copying only when they are on different volumes."""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        # EXDEV on POSIX; Windows reports ERROR_NOT_SAME_DEVICE (17)
+        if e.errno != errno.EXDEV and getattr(e, "winerror", None) != 17:
+            raise
+        shutil.move(src, str(dst))
 
 
 def file_to_destination(
@@ -77,13 +124,26 @@ def file_to_destination(
         }
     """
     dest_dir = resolve_destination(type_name, destination_root, folder_mappings, extracted_fields)
-    extension = pathlib.Path(file_path).suffix
+    extension = os.path.splitext(file_path)[1]
     target = dest_dir / f"{generated_name}{extension}"
 
-    duplicate = target.exists()
-    target = resolve_duplicate(target)
-
-    shutil.move(file_path, str(target))
+    try:
+        target, duplicate = resolve_duplicate(target)
+    except FileNotFoundError:
+        # Directory removed since it was cached; recreate it once
+        with _ensured_lock:
+            _ENSURED_DIRS.discard(str(dest_dir))
+        _ensure_dir(dest_dir)
+        target, duplicate = resolve_duplicate(target)
+    try:
+        _move(file_path, target)
+    except BaseException:
+        # Release the placeholder so a retry can claim the same name
+        try:
+            os.unlink(target)
+        except OSError:
+            pass
+        raise
 
     return {
         "source": file_path,
@@ -91,3 +151,46 @@ def file_to_destination(
         "type_name": type_name,
         "duplicate_handled": duplicate,
     }
+
+
+def file_batch_to_destination(
+    jobs: list[dict],
+    destination_root: str,
+    folder_mappings: dict,
+    max_workers: int = 8,
+) -> list[dict]:
+    """
+    Run file_to_destination for many files concurrently.
+
+    Each job is a dict with "file_path", "generated_name", "type_name" and
+    optionally "extracted_fields".  Destination folders are created up
+    front, then the claims and renames (syscall-bound, GIL released) run
+    on a thread pool.
+
+    Returns one result per job, in job order; a job that raised gets
+    {"source": file_path, "error": str} instead of the usual result.
+    """
+    for job in jobs:
+        try:
+            resolve_destination(
+                job["type_name"], destination_root, folder_mappings,
+                job.get("extracted_fields"),
+            )
+        except ValueError:
+            pass  # reported by that job's own file_to_destination call
+
+    def _run(job: dict) -> dict:
+        try:
+            return file_to_destination(
+                file_path=job["file_path"],
+                generated_name=job["generated_name"],
+                type_name=job["type_name"],
+                destination_root=destination_root,
+                folder_mappings=folder_mappings,
+                extracted_fields=job.get("extracted_fields"),
+            )
+        except Exception as e:
+            return {"source": job["file_path"], "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_run, jobs))
@@ -1,14 +1,106 @@
 # src/fuzzy_matcher.py
-"""Reusable fuzzy string matching using difflib.SequenceMatcher."""
+"""Reusable fuzzy string matching (rapidfuzz when installed, else difflib)."""
 
 from difflib import SequenceMatcher
 
+from src.derived_cache import get_derived
+
+try:
+    from rapidfuzz import fuzz, process  # optional: C++ fuzzy scoring
+except ImportError:
+    fuzz = process = None
+
 
 def _normalize(text: str) -> str:
     """Lowercase and strip whitespace for comparison."""
     return text.lower().strip()
 
 
+def _candidate_lists(reference_entries: dict) -> tuple[list, list, dict]:
+    """
+    Flattened, normalized names and aliases, built once per entries dict.
+
+    Code that adds or renames entries in place must call
+    ``invalidate(reference_entries, "fuzzy_candidates")`` afterwards.
+    """
+    return get_derived(
+        reference_entries, "fuzzy_candidates", _build_candidate_lists
+    )
+
+
+def _build_candidate_lists(reference_entries: dict) -> tuple[list, list, dict]:
+    """
+    Flatten every entry's name and aliases for scanning.
+
+    Returns (choices, owners, exact): normalized candidate strings, the
+    entry key owning each one, and {normalized: first owning key} for the
+    exact-match short-circuit.
+    """
+    choices = []
+    owners = []
+    exact = {}
+    for key, entry in reference_entries.items():
+        candidates = [entry.get("name", "")]
+        candidates.extend(entry.get("aliases", []))
+        for candidate in candidates:
+            candidate_norm = _normalize(candidate)
+            if candidate_norm:
+                choices.append(candidate_norm)
+                owners.append(key)
+                exact.setdefault(candidate_norm, key)
+    return choices, owners, exact
+
+
+def _best_candidate(
+    query_norm: str, reference_entries: dict, threshold: float = 0.0
+) -> tuple[str | None, float]:
+    """
+    Return (key, ratio) of the closest name/alias to *query_norm*.
+
+    Exact matches return 1.0 immediately; otherwise the first highest
+    ratio wins.  Scored with rapidfuzz's fuzz.ratio (normalized Indel
+    similarity, never below difflib's ratio) when installed, else with
+    SequenceMatcher.
+
+    Candidates that provably cannot reach *threshold* are skipped without
+    a full comparison, so when nothing reaches it the returned ratio is
+    the best among the candidates actually scored (possibly 0.0).
+    """
+    choices, owners, exact = _candidate_lists(reference_entries)
+    key = exact.get(query_norm)
+    if key is not None:
+        return key, 1.0
+    if not choices:
+        return None, 0.0
+
+    if process is not None:
+        hit = process.extractOne(
+            query_norm, choices, scorer=fuzz.ratio, processor=None,
+            score_cutoff=threshold * 100,
+        )
+        if hit is None:
+            return None, 0.0
+        _, score, index = hit
+        return owners[index], score / 100
+
+    # real_quick_ratio (length bound) and quick_ratio (shared-character
+    # bound) are cheap upper bounds on ratio(); a candidate is only fully
+    # scored if both can still reach the threshold and the best so far.
+    matcher = SequenceMatcher(None, query_norm, "")
+    best_key = None
+    best_ratio = 0.0
+    for candidate_norm, key in zip(choices, owners):
+        floor = max(best_ratio, threshold)
+        matcher.set_seq2(candidate_norm)
+        if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+            continue
+        ratio = matcher.ratio()
+        if ratio > best_ratio:
+            best_ratio = ratio
+            best_key = key
+    return best_key, best_ratio
+
+
 def fuzzy_match(
     query: str,
     reference_entries: dict,
@@ -23,37 +115,78 @@ def fuzzy_match(
 
     Returns:
         (matched_key, best_ratio) — matched_key is the dict key of the
-        best match, or None if no match meets the threshold.
+        best match, or None if no match meets the threshold (best_ratio
+        then covers only candidates that could have reached it).
     """
     query_norm = _normalize(query)
     if not query_norm:
         return None, 0.0
 
-    best_key = None
-    best_ratio = 0.0
+    best_key, best_ratio = _best_candidate(
+        query_norm, reference_entries, threshold
+    )
+    if best_ratio >= threshold:
+        return best_key, best_ratio
 
-    for key, entry in reference_entries.items():
-        candidates = [entry.get("name", "")]
-        candidates.extend(entry.get("aliases", []))
+    return None, best_ratio
 
-        for candidate in candidates:
-            candidate_norm = _normalize(candidate)
-            if not candidate_norm:
-                continue
 
-            # Exact match short-circuit
-            if query_norm == candidate_norm:
-                return key, 1.0
+def best_line_match(
+    lines: list[str],
+    reference_entries: dict,
+    threshold: float = 0.95,
+) -> tuple[str | None, float]:
+    """
+    Find the best fuzzy match between any text line and any entry.
 
-            ratio = SequenceMatcher(None, query_norm, candidate_norm).ratio()
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_key = key
+    Equivalent to calling fuzzy_match() on each non-blank line and keeping
+    the highest ratio (first line wins ties). With rapidfuzz installed the
+    comparisons run in C via process.extractOne, scored with fuzz.ratio
+    (normalized Indel similarity, which never scores below difflib's ratio).
 
-    if best_ratio >= threshold:
+    Returns:
+        (matched_key, best_ratio) or (None, 0.0) if nothing meets threshold.
+    """
+    if process is None:
+        best_key = None
+        best_ratio = 0.0
+        for line in lines:
+            line_stripped = line.strip()
+            if not line_stripped:
+                continue
+            matched_key, ratio = fuzzy_match(
+                line_stripped, reference_entries, threshold=threshold
+            )
+            if matched_key and ratio > best_ratio:
+                best_key = matched_key
+                best_ratio = ratio
         return best_key, best_ratio
 
-    return None, best_ratio
+    choices, owners, _ = _candidate_lists(reference_entries)
+    if not choices:
+        return None, 0.0
+
+    best_key = None
+    best_score = threshold * 100
+    for line in lines:
+        line_norm = _normalize(line)
+        if not line_norm:
+            continue
+        hit = process.extractOne(
+            line_norm, choices, scorer=fuzz.ratio, processor=None,
+            score_cutoff=best_score,
+        )
+        if hit is None:
+            continue
+        _, score, index = hit
+        if best_key is None or score > best_score:
+            best_key = owners[index]
+            best_score = score
+            if score == 100:
+                break
+    if best_key is None:
+        return None, 0.0
+    return best_key, best_score / 100
 
 
 def fuzzy_match_with_support(
@@ -88,26 +221,12 @@ def fuzzy_match_with_support(
     if supporting_values is None:
         supporting_values = {}
 
-    best_key = None
-    best_ratio = 0.0
-
-    for key, entry in reference_entries.items():
-        candidates = [entry.get("name", "")]
-        candidates.extend(entry.get("aliases", []))
-
-        for candidate in candidates:
-            candidate_norm = _normalize(candidate)
-            if not candidate_norm:
-                continue
-
-            # 1. Exact match short-circuit
-            if query_norm == candidate_norm:
-                return key, 1.0
-
-            ratio = SequenceMatcher(None, query_norm, candidate_norm).ratio()
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_key = key
+    # 1. Exact match short-circuits inside _best_candidate
+    best_key, best_ratio = _best_candidate(
+        query_norm, reference_entries, threshold
+    )
+    if best_ratio == 1.0:
+        return best_key, best_ratio
 
     if best_ratio < threshold or best_key is None:
         return None, best_ratio
@@ -1,8 +1,16 @@
 # src/gap_analyzer.py
-"""Diagnose classification and extraction misses — pure business logic."""
+"""Diagnose classification and extraction misses — pure business logic.
 
+Entry points accept the extracted text as a str or a TextBundle; it is
+lowercased and split into lines at most once per call graph.
+"""
+
+import bisect
 import re
 from collections import Counter
+from functools import lru_cache
+
+from src.content_matcher import as_text_bundle, keywords_in_text
 
 # Common English stopwords to filter from keyword suggestions
 _STOPWORDS = frozenset({
@@ -16,7 +24,8 @@ _STOPWORDS = frozenset({
     "please", "thank", "note", "item", "none", "null", "true", "false",
 })
 
-# Regex patterns for structured formats commonly found in documents
+# Regex patterns for structured formats commonly found in documents,
+# as (search, suggestion); the search side is compiled into _STRUCTURE_RES
 _STRUCTURE_PATTERNS = [
     # Dates
     (r"\d{1,2}/\d{1,2}/\d{2,4}", r"\d{1,2}/\d{1,2}/\d{2,4}"),
@@ -34,6 +43,76 @@ _STRUCTURE_PATTERNS = [
     # Email addresses
     (r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"),
 ]
+_STRUCTURE_RES = tuple(
+    (re.compile(search, re.IGNORECASE), suggest)
+    for search, suggest in _STRUCTURE_PATTERNS
+)
+
+# Candidate keyword phrases: capitalized (2-3 words) and ALL-CAPS (2+ words)
+_CAP_PHRASE_RE = re.compile(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})\b")
+_UPPER_PHRASE_RE = re.compile(r"\b([A-Z]{2,}(?:\s+[A-Z]{2,}){1,2})\b")
+
+# Both phrase shapes in one full-text scan.  Whitespace between words
+# excludes every str.splitlines() boundary so no phrase spans two lines.
+_INLINE_SPACE = r"[^\S\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]+"
+_PHRASE_RE = re.compile(
+    rf"(?P<cap>\b[A-Z][a-z]+(?:{_INLINE_SPACE}[A-Z][a-z]+){{1,2}}\b)"
+    rf"|(?P<upper>\b[A-Z]{{2,}}(?:{_INLINE_SPACE}[A-Z]{{2,}}){{1,2}}\b)"
+)
+
+# Value shapes searched for by the _find_*_candidates helpers
+_DATE_PATTERNS = (
+    r"(\d{1,2}/\d{1,2}/\d{2,4})",
+    r"(\d{1,2}-\d{1,2}-\d{2,4})",
+    r"(\d{4}-\d{2}-\d{2})",
+    r"((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4})",
+)
+_DATE_PATTERNS_COMPILED = tuple(
+    (re.compile(dp, re.IGNORECASE), dp) for dp in _DATE_PATTERNS
+)
+_REF_PATTERNS_COMPILED = tuple(
+    (re.compile(rp), rp) for rp in (
+        r"([A-Z]{0,5}[-#]?\d{3,})",
+        r"(\d{4,})",
+    )
+)
+_CURRENCY_RE = re.compile(r"\$?([\d,]+\.\d{2})")
+
+# Value-type probes used by _detect_field_candidates
+_URL_SCHEME_RE = re.compile(r"^https?$", re.IGNORECASE)
+# One match() classifies a value; alternatives are tried in priority order
+# (a date anywhere, then an amount anywhere, then a whole-value reference,
+# then a leading name) and lastgroup names the winner
+_VALUE_CLASSIFIER = re.compile(
+    r"(?=.*?\d{1,2}[/-]\d{1,2}[/-]\d{2,4})(?P<date>)"
+    r"|(?=.*?\$?[\d,]+\.\d{2})(?P<amount>)"
+    r"|(?P<reference>[A-Z0-9][-A-Z0-9]{2,}$)"
+    r"|(?P<name>[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)"
+)
+_NON_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_FIELD_SEPARATOR_RE = re.compile(r"[_-]")
+
+
+@lru_cache(maxsize=4096)
+def _compile(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compile a config-supplied pattern once; re.error propagates uncached."""
+    return re.compile(pattern, flags)
+
+
+# Label/prefix text repeats across pages (headers, "Total:" lines), so
+# escaping it for suggested patterns is memoized
+_escape = lru_cache(maxsize=1024)(re.escape)
+
+
+@lru_cache(maxsize=256)
+def _label_re(field_name: str, value_re: str) -> re.Pattern:
+    """Case-insensitive "<field words><separator><value>" matcher for *field_name*."""
+    field_words = _FIELD_SEPARATOR_RE.sub(" ", field_name).strip()
+    flexible = field_words.replace(" ", r"\s+")
+    return re.compile(
+        rf"(?:{re.escape(field_words)}|{flexible}){value_re}",
+        re.IGNORECASE,
+    )
 
 
 def analyze_classification_gap(
@@ -49,15 +128,18 @@ def analyze_classification_gap(
     """
     types = type_definitions.get("types", {})
     typedef = types.get(type_name, {})
-    text_lower = extracted_text.lower()
+    bundle = as_text_bundle(extracted_text)
+    extracted_text = bundle.raw
 
     # --- Keywords ---
     type_keywords = typedef.get("content_keywords", [])
-    matched_keywords = [kw for kw in type_keywords if kw.lower() in text_lower]
-    missed_keywords = [kw for kw in type_keywords if kw.lower() not in text_lower]
+    # Shares the classifier's keyword index (Aho-Corasick when installed)
+    present = keywords_in_text(bundle.lower, type_definitions)
+    matched_keywords = [kw for kw in type_keywords if kw.lower() in present]
+    missed_keywords = [kw for kw in type_keywords if kw.lower() not in present]
 
     # Suggested keywords: distinctive terms found in text but not in config
-    suggested_keywords = _suggest_keywords(extracted_text, type_keywords, types)
+    suggested_keywords = _suggest_keywords(bundle, type_keywords, types)
 
     # --- Patterns ---
     type_patterns = typedef.get("content_patterns", [])
@@ -65,7 +147,7 @@ def analyze_classification_gap(
     missed_patterns = []
     for pattern in type_patterns:
         try:
-            if re.search(pattern, extracted_text, re.IGNORECASE):
+            if _compile(pattern, re.IGNORECASE).search(extracted_text):
                 matched_patterns.append(pattern)
             else:
                 missed_patterns.append(pattern)
@@ -105,14 +187,16 @@ def analyze_document_for_new_type(extracted_text: str) -> dict:
             ],
         }
     """
+    bundle = as_text_bundle(extracted_text)
+
     # Keywords — reuse helper with empty existing lists
-    suggested_keywords = _suggest_keywords(extracted_text, [], {})
+    suggested_keywords = _suggest_keywords(bundle, [], {})
 
     # Patterns — reuse helper with empty existing list
-    suggested_patterns = _suggest_patterns(extracted_text, [])
+    suggested_patterns = _suggest_patterns(bundle.raw, [])
 
     # Fields — detect label:value structures in the text
-    detected_fields = _detect_field_candidates(extracted_text)
+    detected_fields = _detect_field_candidates(bundle)
 
     return {
         "suggested_keywords": suggested_keywords,
@@ -141,7 +225,7 @@ def find_nearby_keywords(
     existing_population = existing_population or set()
     existing_lower = {p.lower() for p in existing_population}
     kw_lower = keyword.lower()
-    lines = text.splitlines()
+    lines = as_text_bundle(text).lines
 
     # Find matching line indices
     match_indices = [
@@ -172,16 +256,12 @@ def find_nearby_keywords(
                 candidates[label] += 1
 
         # Capitalized multi-word phrases (2-3 words)
-        cap_phrases = re.findall(
-            r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})\b", stripped
-        )
+        cap_phrases = _CAP_PHRASE_RE.findall(stripped)
         for phrase in cap_phrases:
             candidates[phrase] += 1
 
         # ALL-CAPS phrases (2+ words)
-        upper_phrases = re.findall(
-            r"\b([A-Z]{2,}(?:\s+[A-Z]{2,}){1,2})\b", stripped
-        )
+        upper_phrases = _UPPER_PHRASE_RE.findall(stripped)
         for phrase in upper_phrases:
             candidates[phrase] += 1
 
@@ -193,8 +273,7 @@ def find_nearby_keywords(
             continue
         if phrase_lower in existing_lower:
             continue
-        words = phrase_lower.split()
-        if len(words) == 1 and phrase_lower in _STOPWORDS:
+        if phrase_lower in _STOPWORDS:
             continue
         if len(phrase) < 3 or len(phrase) > 50:
             continue
@@ -220,6 +299,12 @@ def analyze_extraction_gap(
     types = type_definitions.get("types", {})
     typedef = types.get(type_name, {})
     field_defs = typedef.get("extraction_fields", {})
+    bundle = as_text_bundle(extracted_text)
+    extracted_text = bundle.raw
+
+    # Fields often share patterns (e.g. the same date regex); each
+    # distinct pattern is searched once per call
+    outcomes: dict[str, tuple[bool, str | None]] = {}
 
     result = {}
     for field_name in missing_fields:
@@ -229,23 +314,27 @@ def analyze_extraction_gap(
         # Test each existing pattern against the text
         pattern_results = []
         for pattern in patterns:
-            try:
-                match = re.search(pattern, extracted_text, re.IGNORECASE | re.MULTILINE)
-                pattern_results.append({
-                    "pattern": pattern,
-                    "matched": bool(match),
-                    "match_text": match.group(1).strip() if match else None,
-                })
-            except (re.error, IndexError):
-                pattern_results.append({
-                    "pattern": pattern,
-                    "matched": False,
-                    "match_text": None,
-                })
+            outcome = outcomes.get(pattern)
+            if outcome is None:
+                try:
+                    match = _compile(
+                        pattern, re.IGNORECASE | re.MULTILINE
+                    ).search(extracted_text)
+                    outcome = (
+                        bool(match), match.group(1).strip() if match else None
+                    )
+                except (re.error, IndexError):
+                    outcome = (False, None)
+                outcomes[pattern] = outcome
+            pattern_results.append({
+                "pattern": pattern,
+                "matched": outcome[0],
+                "match_text": outcome[1],
+            })
 
         # Find candidate values in the text
         candidate_values = _find_candidate_values(
-            extracted_text, field_name, patterns
+            bundle, field_name, patterns
         )
 
         result[field_name] = {
@@ -262,7 +351,7 @@ def analyze_extraction_gap(
 # ---------------------------------------------------------------------------
 
 def _suggest_keywords(
-    text: str,
+    bundle,
     existing_keywords: list[str],
     all_types: dict,
 ) -> list[str]:
@@ -284,29 +373,27 @@ def _suggest_keywords(
         for kw in typedef.get("content_keywords", []):
             all_keywords_lower.add(kw.lower())
 
-    candidates = Counter()
-    lines = text.splitlines()
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
+    text = bundle.raw
+    lines, starts = bundle.line_index
+    # (line, kind, offset, phrase); sorted so first-seen order (which breaks
+    # frequency ties below) matches a line-by-line scan
+    hits = []
 
-        # Extract label portions from lines containing ':'
-        if ":" in stripped:
-            label = stripped.split(":")[0].strip()
+    # Extract label portions from lines containing ':'
+    for idx, line in enumerate(lines):
+        if ":" in line:
+            label = line.partition(":")[0].strip()
             if 2 <= len(label) <= 50 and not label.isdigit():
-                candidates[label] += 1
+                hits.append((idx, 0, 0, label))
 
-        # Extract capitalized multi-word phrases (2-3 words)
-        cap_phrases = re.findall(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,2})\b", stripped)
-        for phrase in cap_phrases:
-            candidates[phrase] += 1
+    # Capitalized multi-word phrases (2-3 words) and ALL-CAPS phrases (2+ words)
+    for m in _PHRASE_RE.finditer(text):
+        idx = bisect.bisect_right(starts, m.start()) - 1
+        kind = 1 if m.lastgroup == "cap" else 2
+        hits.append((idx, kind, m.start(), m.group()))
 
-        # Extract ALL-CAPS phrases (2+ words)
-        upper_phrases = re.findall(r"\b([A-Z]{2,}(?:\s+[A-Z]{2,}){1,2})\b", stripped)
-        for phrase in upper_phrases:
-            candidates[phrase] += 1
+    hits.sort()
+    candidates = Counter(hit[3] for hit in hits)
 
     # Filter
     filtered = {}
@@ -315,9 +402,9 @@ def _suggest_keywords(
         # Skip if already in this type's keywords
         if phrase_lower in existing_lower:
             continue
-        # Skip stopwords (single words)
-        words = phrase_lower.split()
-        if len(words) == 1 and phrase_lower in _STOPWORDS:
+        # Skip stopwords (all single words, and candidates are stripped,
+        # so set membership alone implies a one-word phrase)
+        if phrase_lower in _STOPWORDS:
             continue
         # Skip very short or very long
         if len(phrase) < 3 or len(phrase) > 50:
@@ -336,29 +423,28 @@ def _suggest_patterns(text: str, existing_patterns: list[str]) -> list[str]:
     """
     suggestions = []
 
-    for search_re, suggest_re in _STRUCTURE_PATTERNS:
-        try:
-            if re.search(search_re, text, re.IGNORECASE):
-                # Check if already covered by existing patterns
-                already_covered = False
-                for existing in existing_patterns:
-                    try:
-                        # If existing pattern matches the same structures, skip
-                        if re.search(existing, re.search(search_re, text).group(), re.IGNORECASE):
-                            already_covered = True
-                            break
-                    except (re.error, AttributeError):
-                        continue
-                if not already_covered and suggest_re not in suggestions:
-                    suggestions.append(suggest_re)
-        except re.error:
-            continue
+    for search_re, suggest_re in _STRUCTURE_RES:
+        found = search_re.search(text)
+        if found:
+            sample = found.group()
+            # Check if already covered by existing patterns
+            already_covered = False
+            for existing in existing_patterns:
+                try:
+                    # If existing pattern matches the same structures, skip
+                    if _compile(existing, re.IGNORECASE).search(sample):
+                        already_covered = True
+                        break
+                except re.error:
+                    continue
+            if not already_covered and suggest_re not in suggestions:
+                suggestions.append(suggest_re)
 
     return suggestions
 
 
 def _find_candidate_values(
-    text: str,
+    bundle,
     field_name: str,
     existing_patterns: list[str],
 ) -> list[dict]:
@@ -367,15 +453,20 @@ def _find_candidate_values(
     """
     field_lower = field_name.lower()
     candidates = []
-    lines = text.splitlines()
+    text = bundle.raw
+    lines, starts = bundle.line_index
 
     # Determine value type from field name
     if "date" in field_lower:
-        candidates = _find_date_candidates(text, lines, existing_patterns)
+        candidates = _find_date_candidates(text, lines, starts, existing_patterns)
     elif any(w in field_lower for w in ("number", "num", "id", "ref", "invoice", "po", "order")):
-        candidates = _find_reference_candidates(text, lines, field_name, existing_patterns)
+        candidates = _find_reference_candidates(
+            text, lines, starts, field_name, existing_patterns
+        )
     elif any(w in field_lower for w in ("amount", "total", "balance", "price", "cost")):
-        candidates = _find_currency_candidates(text, lines, field_name, existing_patterns)
+        candidates = _find_currency_candidates(
+            text, lines, starts, field_name, existing_patterns
+        )
     elif any(w in field_lower for w in ("name", "vendor", "customer", "company", "client")):
         candidates = _find_name_candidates(text, lines, field_name, existing_patterns)
     else:
@@ -385,93 +476,97 @@ def _find_candidate_values(
     return candidates[:10]  # Cap at 10 candidates
 
 
-def _find_date_candidates(text, lines, existing_patterns):
+def _scan_lines(text, lines, starts, compiled, skip_lines=()):
+    """
+    Run each (pattern, source) in *compiled* once over the whole text.
+
+    Returns [(line_idx, pattern_order, match, source)] in the order a
+    line-by-line, pattern-by-pattern finditer would produce.  Matches that
+    run past the end of their line are dropped, since a per-line scan could
+    not have produced them; lines in *skip_lines* are ignored.
+    """
+    hits = []
+    for order, (pattern_re, source) in enumerate(compiled):
+        for m in pattern_re.finditer(text):
+            idx = bisect.bisect_right(starts, m.start()) - 1
+            if idx in skip_lines or m.end() > starts[idx] + len(lines[idx]):
+                continue
+            hits.append((idx, order, m.start(), m, source))
+    hits.sort(key=lambda hit: hit[:3])
+    return [(idx, order, m, source) for idx, order, _, m, source in hits]
+
+
+def _find_date_candidates(text, lines, starts, existing_patterns):
     """Find date-like values in text."""
     candidates = []
-    date_patterns = [
-        r"(\d{1,2}/\d{1,2}/\d{2,4})",
-        r"(\d{1,2}-\d{1,2}-\d{2,4})",
-        r"(\d{4}-\d{2}-\d{2})",
-        r"((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4})",
-    ]
-    for i, line in enumerate(lines, 1):
-        for dp in date_patterns:
-            for m in re.finditer(dp, line, re.IGNORECASE):
-                # Build a context-aware regex suggestion
-                prefix = line[:m.start()].strip()
-                if prefix:
-                    # Use the label before the date as context
-                    safe_prefix = re.escape(prefix[-30:])
-                    suggested = f"{safe_prefix}\\s*({dp.strip('()')})"
-                else:
-                    suggested = dp
-                candidates.append({
-                    "text_snippet": m.group(1),
-                    "line_number": i,
-                    "suggested_pattern": suggested,
-                })
+    for idx, _, m, dp in _scan_lines(text, lines, starts, _DATE_PATTERNS_COMPILED):
+        # Build a context-aware regex suggestion
+        prefix = text[starts[idx]:m.start()].strip()
+        if prefix:
+            # Use the label before the date as context
+            safe_prefix = _escape(prefix[-30:])
+            suggested = f"{safe_prefix}\\s*({dp.strip('()')})"
+        else:
+            suggested = dp
+        candidates.append({
+            "text_snippet": m.group(1),
+            "line_number": idx + 1,
+            "suggested_pattern": suggested,
+        })
     return candidates
 
 
-def _find_reference_candidates(text, lines, field_name, existing_patterns):
+def _find_reference_candidates(text, lines, starts, field_name, existing_patterns):
     """Find reference number-like values."""
-    candidates = []
-    ref_patterns = [
-        r"([A-Z]{0,5}[-#]?\d{3,})",
-        r"(\d{4,})",
-    ]
-    # Also look for labeled references
-    field_words = re.sub(r"[_-]", " ", field_name).strip()
-    label_re = re.compile(
-        rf"(?:{re.escape(field_words)}|{field_words.replace(' ', r'\\s+')})"
-        r"[:\s#]*([A-Za-z0-9][-A-Za-z0-9]{2,})",
-        re.IGNORECASE,
-    )
-
-    for i, line in enumerate(lines, 1):
+    # (line_idx, order) -> candidate; labeled lines sort ahead of (and
+    # suppress) bare reference numbers on the same line
+    found = {}
+    label_re = _label_re(field_name, r"[:\s#]*([A-Za-z0-9][-A-Za-z0-9]{2,})")
+    for idx, line in enumerate(lines):
         m = label_re.search(line)
         if m:
-            safe_label = re.escape(line[:m.start(1)].strip()[-40:])
-            candidates.append({
+            safe_label = _escape(line[:m.start(1)].strip()[-40:])
+            found[(idx, -1, 0)] = {
                 "text_snippet": m.group(1),
-                "line_number": i,
+                "line_number": idx + 1,
                 "suggested_pattern": f"{safe_label}\\s*([A-Za-z0-9][-A-Za-z0-9]+)",
-            })
-        else:
-            for rp in ref_patterns:
-                for m2 in re.finditer(rp, line):
-                    prefix = line[:m2.start()].strip()
-                    if prefix:
-                        safe_prefix = re.escape(prefix[-30:])
-                        candidates.append({
-                            "text_snippet": m2.group(1),
-                            "line_number": i,
-                            "suggested_pattern": f"{safe_prefix}\\s*({rp.strip('()')})",
-                        })
-    return candidates
+            }
+    labeled = {idx for idx, _, _ in found}
+
+    for idx, order, m, rp in _scan_lines(
+        text, lines, starts, _REF_PATTERNS_COMPILED, skip_lines=labeled
+    ):
+        prefix = text[starts[idx]:m.start()].strip()
+        if prefix:
+            safe_prefix = _escape(prefix[-30:])
+            found[(idx, order, m.start())] = {
+                "text_snippet": m.group(1),
+                "line_number": idx + 1,
+                "suggested_pattern": f"{safe_prefix}\\s*({rp.strip('()')})",
+            }
+    return [found[key] for key in sorted(found)]
 
 
-def _find_currency_candidates(text, lines, field_name, existing_patterns):
+def _find_currency_candidates(text, lines, starts, field_name, existing_patterns):
     """Find currency/amount values."""
     candidates = []
-    currency_re = re.compile(r"\$?([\d,]+\.\d{2})")
-
-    for i, line in enumerate(lines, 1):
-        for m in currency_re.finditer(line):
-            prefix = line[:m.start()].strip()
-            if prefix:
-                safe_prefix = re.escape(prefix[-30:])
-                candidates.append({
-                    "text_snippet": m.group(0),
-                    "line_number": i,
-                    "suggested_pattern": f"{safe_prefix}\\s*\\$?([\\d,]+\\.\\d{{2}})",
-                })
-            else:
-                candidates.append({
-                    "text_snippet": m.group(0),
-                    "line_number": i,
-                    "suggested_pattern": r"\$?([\d,]+\.\d{2})",
-                })
+    for idx, _, m, _ in _scan_lines(
+        text, lines, starts, ((_CURRENCY_RE, None),)
+    ):
+        prefix = text[starts[idx]:m.start()].strip()
+        if prefix:
+            safe_prefix = _escape(prefix[-30:])
+            candidates.append({
+                "text_snippet": m.group(0),
+                "line_number": idx + 1,
+                "suggested_pattern": f"{safe_prefix}\\s*\\$?([\\d,]+\\.\\d{{2}})",
+            })
+        else:
+            candidates.append({
+                "text_snippet": m.group(0),
+                "line_number": idx + 1,
+                "suggested_pattern": r"\$?([\d,]+\.\d{2})",
+            })
     return candidates
 
 
@@ -479,19 +574,14 @@ def _find_name_candidates(text, lines, field_name, existing_patterns):
     """Find proper noun / entity name candidates."""
     candidates = []
     # Look for lines with label:value pattern where label relates to field
-    field_words = re.sub(r"[_-]", " ", field_name).strip()
-    label_re = re.compile(
-        rf"(?:{re.escape(field_words)}|{field_words.replace(' ', r'\\s+')})"
-        r"[:\s]+(.+)",
-        re.IGNORECASE,
-    )
+    label_re = _label_re(field_name, r"[:\s]+(.+)")
 
     for i, line in enumerate(lines, 1):
         m = label_re.search(line)
         if m:
             value = m.group(1).strip()
             if value and len(value) < 100:
-                safe_label = re.escape(line[:m.start(1)].strip())
+                safe_label = _escape(line[:m.start(1)].strip())
                 candidates.append({
                     "text_snippet": value,
                     "line_number": i,
@@ -503,19 +593,14 @@ def _find_name_candidates(text, lines, field_name, existing_patterns):
 def _find_labeled_candidates(text, lines, field_name, existing_patterns):
     """Generic: look for labeled values near field name keywords."""
     candidates = []
-    field_words = re.sub(r"[_-]", " ", field_name).strip()
-    label_re = re.compile(
-        rf"(?:{re.escape(field_words)}|{field_words.replace(' ', r'\\s+')})"
-        r"[:\s]+(.+)",
-        re.IGNORECASE,
-    )
+    label_re = _label_re(field_name, r"[:\s]+(.+)")
 
     for i, line in enumerate(lines, 1):
         m = label_re.search(line)
         if m:
             value = m.group(1).strip()
             if value and len(value) < 100:
-                safe_label = re.escape(line[:m.start(1)].strip())
+                safe_label = _escape(line[:m.start(1)].strip())
                 candidates.append({
                     "text_snippet": value,
                     "line_number": i,
@@ -524,7 +609,7 @@ def _find_labeled_candidates(text, lines, field_name, existing_patterns):
     return candidates
 
 
-def _detect_field_candidates(text: str) -> list[dict]:
+def _detect_field_candidates(bundle) -> list[dict]:
     """
     Detect label:value pairs in text that could become extraction fields.
 
@@ -533,16 +618,16 @@ def _detect_field_candidates(text: str) -> list[dict]:
     """
     candidates = []
     seen_field_names = set()
-    lines = text.splitlines()
+    lines = bundle.lines
 
     for i, line in enumerate(lines, 1):
         stripped = line.strip()
         if not stripped or ":" not in stripped:
             continue
 
-        parts = stripped.split(":", 1)
-        label = parts[0].strip()
-        value = parts[1].strip() if len(parts) > 1 else ""
+        label, _, value = stripped.partition(":")
+        label = label.strip()
+        value = value.strip()
 
         if not label or not value:
             continue
@@ -551,28 +636,21 @@ def _detect_field_candidates(text: str) -> list[dict]:
         if label.isdigit():
             continue
         # Skip lines that look like timestamps or URLs
-        if re.match(r"^https?$", label, re.IGNORECASE):
+        if _URL_SCHEME_RE.match(label):
             continue
 
         # Determine likely field type from value content
-        field_type = "text"
-        if re.search(r"\d{1,2}[/-]\d{1,2}[/-]\d{2,4}", value):
-            field_type = "date"
-        elif re.search(r"\$?[\d,]+\.\d{2}", value):
-            field_type = "amount"
-        elif re.match(r"^[A-Z0-9][-A-Z0-9]{2,}$", value):
-            field_type = "reference"
-        elif re.match(r"^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+", value):
-            field_type = "name"
+        kind = _VALUE_CLASSIFIER.match(value)
+        field_type = kind.lastgroup if kind else "text"
 
         # Generate field name from label
-        field_name = re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+        field_name = _NON_SLUG_RE.sub("_", label.lower()).strip("_")
         if not field_name or field_name in seen_field_names:
             continue
         seen_field_names.add(field_name)
 
         # Generate extraction pattern using raw string templates
-        safe_label = re.escape(label)
+        safe_label = _escape(label)
         if field_type == "date":
             pattern = safe_label + r"[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})"
         elif field_type == "amount":
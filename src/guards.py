@@ -2,7 +2,22 @@
 """Pre-processing guards to catch edge cases before classification."""
 
 import os
-import pathlib
+import stat
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Bytes of a PDF's header searched for an /Encrypt entry
+_PDF_SCAN_BYTES = 4096
+
+# Name checks for temp/system files and partial downloads
+_HIDDEN_PREFIXES = (".", "~$")
+_INCOMPLETE_SUFFIXES = frozenset({".tmp", ".crdownload", ".partial"})
+
+# Only Windows refuses to open a file another process is writing; elsewhere
+# an open+read probe finds nothing a stat and an access check don't
+_NEEDS_LOCK_PROBE = sys.platform.startswith("win")
 
 
 class FileGuardError(Exception):
@@ -10,46 +25,138 @@ class FileGuardError(Exception):
     pass
 
 
+def wait_for_stable_file(
+    file_path: str, poll: float = 0.05, max_wait: float = 3.0
+) -> bool:
+    """
+    Wait until a file's size and mtime are unchanged across two samples.
+
+    Gives up after *max_wait* seconds and leaves the rest to check_file().
+    Returns False if the file no longer exists (e.g. already moved).
+    """
+    deadline = time.monotonic() + max_wait
+    previous = None
+    while True:
+        try:
+            st = os.stat(file_path)
+            sample = (st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            return False  # moved by a prior event; nothing to wait for
+        except OSError:
+            # Locked mid-write — back off a little longer
+            sample = None
+        if sample is not None and sample == previous:
+            return True
+        if time.monotonic() >= deadline:
+            return os.path.isfile(file_path)
+        previous = sample
+        time.sleep(poll if sample is not None else poll * 2)
+
+
 def check_file(file_path: str) -> str | None:
     """
     Run all guard checks on a file.
     Returns None if the file is OK, or an error reason string.
+
+    Temp and partial-download names are rejected before any syscall.
+    PDFs, and every file on Windows, are opened once; type, size, lock
+    state and the PDF encryption probe all come from that one descriptor.
+    Other files on POSIX only need a stat and an access check.
     """
-    p = pathlib.Path(file_path)
+    name = os.path.basename(file_path)
+    suffix = os.path.splitext(name)[1].lower()
 
-    # File must exist
-    if not p.exists():
+    # Skip common temp/system files
+    if name.startswith(_HIDDEN_PREFIXES):
+        return "temp_or_hidden_file"
+    if suffix in _INCOMPLETE_SUFFIXES:
+        return "incomplete_download"
+
+    is_pdf = suffix == ".pdf"
+
+    if not is_pdf and not _NEEDS_LOCK_PROBE:
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return "file_not_found"
+        except OSError:
+            return "file_locked"
+        reason = _classify_stat(st)
+        if reason is None and not os.access(file_path, os.R_OK):
+            reason = "file_locked"
+        return reason
+
+    try:
+        # O_NONBLOCK keeps a FIFO in the intake folder from hanging the open
+        fd = os.open(
+            file_path,
+            os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_NONBLOCK", 0),
+        )
+    except FileNotFoundError:
         return "file_not_found"
+    except OSError:
+        # Windows refuses to open directories as well as files held open
+        # by a writer; a stat tells those apart
+        return _classify_unopenable(file_path)
+
+    try:
+        st = os.fstat(fd)
+        reason = _classify_stat(st)
+        if reason is not None:
+            return reason
+
+        # Check if file is still being written (can't read it yet); the
+        # same read supplies the PDF header checked below
+        try:
+            header = os.read(fd, _PDF_SCAN_BYTES)
+        except OSError:
+            return "file_locked"
 
+        encrypted = is_pdf and b"/Encrypt" in header
+    finally:
+        os.close(fd)
+
+    # Check for password-protected PDFs (OCR will fail)
+    if encrypted:
+        return "password_protected_pdf"
+
+    return None
+
+
+def check_files_parallel(
+    paths: list[str], max_workers: int | None = None
+) -> list[str | None]:
+    """
+    Run check_file for many paths on a thread pool.
+
+    The checks are syscall-bound (the GIL is released in stat/open/read),
+    so threads overlap their disk latency.  *max_workers* defaults to four
+    per CPU.  Returns one result per path, in path order.
+    """
+    if max_workers is None:
+        max_workers = (os.cpu_count() or 1) * 4
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(check_file, paths))
+
+
+def _classify_stat(st: os.stat_result) -> str | None:
+    """Guard reason from a stat result alone, or None."""
     # Must be a file, not a directory
-    if not p.is_file():
+    if not stat.S_ISREG(st.st_mode):
         return "not_a_file"
 
     # Zero-byte files cannot be classified
-    if p.stat().st_size == 0:
+    if st.st_size == 0:
         return "zero_byte_file"
+    return None
 
-    # Check if file is still being written (can't open exclusively)
+
+def _classify_unopenable(file_path: str) -> str:
+    """Guard reason for a path that exists but could not be opened."""
     try:
-        with open(file_path, "rb") as f:
-            f.read(1)
-    except (PermissionError, OSError):
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return "file_not_found"
+    except OSError:
         return "file_locked"
-
-    # Skip common temp/system files
-    if p.name.startswith(".") or p.name.startswith("~$"):
-        return "temp_or_hidden_file"
-    if p.suffix.lower() in (".tmp", ".crdownload", ".partial"):
-        return "incomplete_download"
-
-    # Check for password-protected PDFs (OCR will fail)
-    if p.suffix.lower() == ".pdf":
-        try:
-            with open(file_path, "rb") as f:
-                header = f.read(4096)
-                if b"/Encrypt" in header:
-                    return "password_protected_pdf"
-        except Exception:
-            pass
-
-    return None
+    return _classify_stat(st) or "file_locked"
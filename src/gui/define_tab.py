@@ -1,13 +1,16 @@
 # src/gui/define_tab.py
 """Define tab — two-column type creation form with optional document analysis."""
 
+import bisect
 import pathlib
 import re
 import tkinter as tk
+from functools import lru_cache
 from tkinter import ttk, messagebox
 
 from src.gap_analyzer import analyze_document_for_new_type
 from src.config_learner import (
+    _generate_entity_key,
     add_entity_reference,
     add_alias_to_entity,
 )
@@ -19,16 +22,83 @@ from src.type_creator_core import (
 )
 
 
+# Analysis depends only on the text, so reopening the tab for the same
+# document (retries, back-and-forth from Review) reuses the result.  Keyed
+# on the full text: a prefix hash could hand one document another's result.
+# Callers must treat the returned dict as read-only.
+_analyze_document = lru_cache(maxsize=16)(analyze_document_for_new_type)
+
+
 # Staging slot names in display order
 _STAGING_SLOTS = ["vendor", "customer", "date", "reference", "amount"]
 
+# One comma-separated token with surrounding whitespace trimmed; findall
+# matches the old split/strip/filter without the intermediate lists
+_TOK_RE = re.compile(r"[^,\s][^,]*[^,\s]|[^,\s]")
+
+# doc_type section rows: (label, attribute, default, hint, required);
+# a default of None makes the row a multi-line Text instead of an Entry
+_DTYPE_FIELDS = (
+    ("Type Name:", "_name_var", "", "(auto-added to keywords)", True),
+    ("Naming Pattern:", "_naming_var", "{original_name}_{date}",
+     "{field_name} tokens", True),
+    ("Container Formats:", "_formats_var", "", "e.g. .pdf,.docx", True),
+    ("Destination Subfolder:", "_dest_var", "", "(optional)", False),
+    ("Content Patterns:", "_patterns_text", None,
+     "one regex/line (optional)", False),
+    ("MIME Types:", "_mime_var", "", "comma-sep (optional)", False),
+)
+_LABEL_FONT = ("Courier", 9)
+_LABEL_FONT_REQUIRED = ("Courier", 9, "bold")
+_HINT_FONT = ("Courier", 7)
+
+# Population routes, one per keyword row
+_KW_ROUTES = ("skip", "tags", "extract", "tags+extract")
+
+# Value-capturing regex appended to the escaped label, by field type;
+# text, name and anything unlisted take the rest of the line
+_TEXT_PATTERN_SUFFIX = r"[:\s]*(.+?)\s*$"
+_PATTERN_SUFFIXES = {
+    "date": r"[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})",
+    "currency": r"[:\s]*\$?([\d,]+\.\d{2})",
+    "reference": r"[:\s]*([A-Za-z0-9][\-A-Za-z0-9]+)",
+    "address": r"[:\s]*(.*?)$",
+    "phone": r"[:\s]*(\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{4})",
+    "email": r"[:\s]*([A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,})",
+    "percentage": r"[:\s]*(\d+\.?\d*\s?%)",
+    "url": r"[:\s]*(https?://\S+)",
+}
+
+# Keyword -> (field_type, ref_role), first match wins.  Each rule is a
+# substring test ("no" matches "invoice no."), compiled as one alternation.
+_FIELD_TYPE_RULES = [
+    (re.compile("|".join(map(re.escape, words))), field_type, ref_role)
+    for words, field_type, ref_role in (
+        (("date",), "date", ""),
+        (("amount", "total", "balance", "charge", "price", "cost", "due"),
+         "currency", ""),
+        (("number", "num", "no", "id", "ref", "invoice", "po", "order"),
+         "reference", ""),
+        (("address", "remit to", "mail to", "street", "location"),
+         "address", ""),
+        (("vendor", "remit", "from", "sold by", "supplier"), "name", "vendor"),
+        (("customer", "client", "bill to", "prepared for", "ship to"),
+         "name", "customer"),
+        (("name",), "name", "vendor"),
+        (("phone", "fax", "tel", "mobile", "cell"), "phone", ""),
+        (("email", "e-mail"), "email", ""),
+        (("percent", "%", "rate", "ratio"), "percentage", ""),
+        (("url", "website", "link", "http"), "url", ""),
+    )
+]
+
 
 class DefineTab(tk.Frame):
     """Type creation form with two-column layout.
 
     Left column (visible only when linked from Review with extracted text):
       - Extracted Text with scrollbar, Population button, search
-      - Keyword Population with toggle buttons (kw/ext/skip)
+      - Keyword Population with a click-to-cycle route per keyword
 
     Right column (always visible):
       - doc_type (metadata)
@@ -57,23 +127,54 @@ class DefineTab(tk.Frame):
         # Text preview widget reference
         self._text_preview = None
 
-        # Dynamic extraction field rows
-        self._field_rows = []
+        # Extraction field rows: {tree iid: row data}
+        self._field_rows = {}
+        self._fields_tree = None
+        self._field_editor = None
+
+        # Staging combos: {slot: (var, combo)}, filled when the section
+        # is first expanded
+        self._staging_vars = {}
+
+        # Collapsible sections built on first expand: {key: section state}
+        self._sections = {}
+
+        # Staging dropdown refresh is deferred to idle time and coalesced;
+        # _staging_values is what the combos currently hold
+        self._staging_refresh_pending = False
+        self._staging_values = None
 
-        # Population rows: [(kw, route_var, row_frame)]
-        self._kw_route_rows = []
+        # Population rows: {tree iid: {kw, route}}; lowercased
+        # keywords shown and deleted, for O(1) dedupe on add
+        self._kw_route_rows = {}
+        self._kw_displayed_lower = set()
         self._kw_deleted = set()
 
         # Track keywords already turned into field rows (prevent dupes on re-Process)
         self._processed_extracts = set()
 
-        # Search state
-        self._search_pos = "1.0"
+        # Search state: (line, col) of the current match, or None for the
+        # top; matches are cached per query until the preview text changes
+        self._search_pos = None
+        self._search_cache = None
 
-        # Left pane visibility
+        # Left pane visibility; its widgets are built on first show
         self._left_visible = False
+        self._left_built = False
+
+        # Right pane sections are built on first map or first use
+        self._right_built = False
+
+        # Scrollable canvases: {canvas: pending wheel delta}; one global
+        # wheel handler routes each event to the canvas under the pointer
+        self._scroll_canvases = {}
+        self._wheel_flush_pending = False
 
         self._build_ui()
+        self.bind("<Map>", lambda e: self._ensure_right_sections())
+        self.bind_all("<MouseWheel>", self._on_wheel)
+        self.bind("<Destroy>", lambda e: e.widget is self
+                  and self.unbind_all("<MouseWheel>"))
 
     # ------------------------------------------------------------------
     # Public API
@@ -81,6 +182,7 @@ class DefineTab(tk.Frame):
 
     def set_return_context(self, file_path, extracted_text=None):
         """Set context for returning to Review tab after save."""
+        self._ensure_right_sections()
         self._return_file_path = file_path
         self._extracted_text = extracted_text
 
@@ -93,7 +195,7 @@ class DefineTab(tk.Frame):
             self._context_frame.pack_forget()
 
         if extracted_text:
-            self._doc_analysis = analyze_document_for_new_type(extracted_text)
+            self._doc_analysis = _analyze_document(extracted_text)
             self._show_left_pane()
             self._populate_text_preview()
             self._populate_population()
@@ -121,9 +223,8 @@ class DefineTab(tk.Frame):
         self._paned = ttk.PanedWindow(self, orient=tk.HORIZONTAL)
         self._paned.pack(fill=tk.BOTH, expand=True, padx=4, pady=4)
 
-        # Left pane (built but not added until needed)
+        # Left pane (built and added only when needed)
         self._left_outer = tk.Frame(self._paned)
-        self._build_left_pane()
 
         # Right pane (always visible)
         self._right_outer = tk.Frame(self._paned)
@@ -155,10 +256,7 @@ class DefineTab(tk.Frame):
         scrollbar = ttk.Scrollbar(outer, orient="vertical",
                                   command=canvas.yview)
         self._left_inner = tk.Frame(canvas)
-        self._left_inner.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all")),
-        )
+        self._bind_scrollregion(canvas, self._left_inner)
         self._left_win_id = canvas.create_window(
             (0, 0), window=self._left_inner, anchor="nw",
         )
@@ -172,7 +270,7 @@ class DefineTab(tk.Frame):
             "<Configure>",
             lambda e: canvas.itemconfigure(self._left_win_id, width=e.width),
         )
-        self._bind_mousewheel(canvas)
+        self._register_scroll_canvas(canvas)
 
         f = self._left_inner
 
@@ -188,6 +286,9 @@ class DefineTab(tk.Frame):
 
 
     def _show_left_pane(self):
+        if not self._left_built:
+            self._build_left_pane()
+            self._left_built = True
         if not self._left_visible:
             self._paned.insert(0, self._left_outer, weight=0)
             self._left_visible = True
@@ -207,10 +308,7 @@ class DefineTab(tk.Frame):
         scrollbar = ttk.Scrollbar(outer, orient="vertical",
                                   command=canvas.yview)
         self._right_inner = tk.Frame(canvas)
-        self._right_inner.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all")),
-        )
+        self._bind_scrollregion(canvas, self._right_inner)
         self._right_win_id = canvas.create_window(
             (0, 0), window=self._right_inner, anchor="nw",
         )
@@ -223,8 +321,16 @@ class DefineTab(tk.Frame):
             "<Configure>",
             lambda e: canvas.itemconfigure(self._right_win_id, width=e.width),
         )
-        self._bind_mousewheel(canvas)
+        self._register_scroll_canvas(canvas)
+
+    def _ensure_right_sections(self):
+        """Fill the right pane the first time the tab is shown or used."""
+        if self._right_built:
+            return
+        self._right_built = True
+        self._build_right_sections()
 
+    def _build_right_sections(self):
         f = self._right_inner
 
         # Doc_Type Fields (top of right column)
@@ -238,15 +344,51 @@ class DefineTab(tk.Frame):
         sec_c.pack(fill=tk.X, padx=6, pady=(0, 6))
         self._build_section_keywords(sec_c)
 
-        # Fields to Extract
-        sec_d = tk.LabelFrame(f, text="extract", padx=6, pady=4)
-        sec_d.pack(fill=tk.X, padx=6, pady=(0, 6))
-        self._build_section_fields(sec_d)
+        # Fields to Extract and Staging Field Mapping are collapsed until
+        # first needed; their widgets are only built on expand
+        self._build_collapsible(f, "fields", "extract",
+                                self._build_section_fields)
+        self._build_collapsible(f, "staging", "Staging Field Mapping",
+                                self._build_staging_on_expand)
+
+    # ------------------------------------------------------------------
+    # Collapsible sections
+    # ------------------------------------------------------------------
 
-        # Staging Field Mapping
-        sec_stg = tk.LabelFrame(f, text="Staging Field Mapping", padx=6, pady=4)
-        sec_stg.pack(fill=tk.X, padx=6, pady=(0, 6))
-        self._build_section_staging(sec_stg)
+    def _build_collapsible(self, parent, key, title, builder):
+        """Add a collapsed section whose body *builder* runs on first expand."""
+        header = tk.Label(parent, text=f"{title} \u25b8", cursor="hand2")
+        sec = tk.LabelFrame(parent, labelwidget=header, padx=6, pady=4)
+        sec.pack(fill=tk.X, padx=6, pady=(0, 6))
+        self._sections[key] = {
+            "title": title,
+            "header": header,
+            "body": tk.Frame(sec),
+            "builder": builder,
+            "built": False,
+            "open": False,
+        }
+        header.bind("<Button-1>", lambda e: self._toggle_section(key))
+
+    def _toggle_section(self, key):
+        section = self._sections[key]
+        if section["open"]:
+            section["body"].pack_forget()
+            section["open"] = False
+            section["header"].config(text=f"{section['title']} \u25b8")
+        else:
+            self._expand_section(key)
+
+    def _expand_section(self, key):
+        """Open section *key*, building its widgets the first time."""
+        section = self._sections[key]
+        if not section["built"]:
+            section["builder"](section["body"])
+            section["built"] = True
+        if not section["open"]:
+            section["body"].pack(fill=tk.X)
+            section["open"] = True
+            section["header"].config(text=f"{section['title']} \u25be")
 
     # ------------------------------------------------------------------
     # Section: Extracted Text
@@ -316,19 +458,28 @@ class DefineTab(tk.Frame):
     def _build_section_population(self, parent):
         tk.Label(
             parent,
-            text="Select route per keyword, then click Process",
+            text="Click a route to cycle it, then click Process",
             font=("Courier", 7), fg="gray",
         ).pack(anchor="w", pady=(0, 4))
 
-        # Grid for header + keyword rows (ensures column alignment)
-        self._kw_grid = tk.Frame(parent)
-        self._kw_grid.pack(fill=tk.X)
-        self._kw_grid.columnconfigure(1, weight=1)
-        self._kw_grid.columnconfigure(2, minsize=50)
-        self._kw_grid.columnconfigure(3, minsize=60)
-        self._kw_grid.columnconfigure(4, minsize=50)
-        self._kw_next_grid_row = 1
-        self._build_kw_grid_headers()
+        # One Treeview for all keyword rows; no per-row widgets
+        tree_frame = tk.Frame(parent)
+        tree_frame.pack(fill=tk.X)
+        self._kw_tree = ttk.Treeview(tree_frame, columns=("keyword", "route"),
+                                     show="headings", height=10,
+                                     selectmode="extended")
+        self._kw_tree.heading("keyword", text="keyword", anchor="w")
+        self._kw_tree.heading("route", text="route", anchor="w")
+        self._kw_tree.column("keyword", width=260, minwidth=80, stretch=True)
+        self._kw_tree.column("route", width=100, minwidth=60, stretch=False)
+        kw_sb = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL,
+                              command=self._kw_tree.yview)
+        self._kw_tree.configure(yscrollcommand=kw_sb.set)
+        kw_sb.pack(side=tk.RIGHT, fill=tk.Y)
+        self._kw_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self._kw_tree.bind("<ButtonRelease-1>", self._on_kw_route_click)
+        self._kw_tree.bind("<Delete>",
+                           lambda e: self._remove_selected_population())
 
         # Bottom bar: Process + write-in
         bottom = tk.Frame(parent)
@@ -345,6 +496,9 @@ class DefineTab(tk.Frame):
                  width=20, font=("Courier", 8)).pack(side=tk.LEFT, padx=4)
         tk.Button(bottom, text="+", font=("Courier", 8),
                   command=self._add_write_in_population).pack(side=tk.LEFT)
+        tk.Button(bottom, text="Remove Selected", font=("Courier", 8),
+                  command=self._remove_selected_population).pack(
+            side=tk.LEFT, padx=(8, 0))
 
         # Count label
         self._kw_count_label = tk.Label(
@@ -353,84 +507,31 @@ class DefineTab(tk.Frame):
         )
         self._kw_count_label.pack(anchor="w", pady=(4, 0))
 
-    def _build_kw_grid_headers(self):
-        """Create column headers in the keyword population grid."""
-        g = self._kw_grid
-        tk.Label(g, text="tags", font=("Courier", 7, "bold")).grid(
-            row=0, column=2, padx=6)
-        tk.Label(g, text="extract", font=("Courier", 7, "bold")).grid(
-            row=0, column=3, padx=6)
-        tk.Label(g, text="skip", font=("Courier", 7, "bold")).grid(
-            row=0, column=4, padx=6)
-
     # ------------------------------------------------------------------
     # Section: Doc_Type Fields (right column, top)
     # ------------------------------------------------------------------
 
     def _build_section_dtype(self, parent):
-        _hint = ("Courier", 7)
         g = tk.Frame(parent)
         g.pack(fill=tk.X)
 
-        row = 0
-        tk.Label(g, text="Type Name: *",
-                 font=("Courier", 9, "bold")).grid(
-            row=row, column=0, sticky="w", padx=4, pady=3)
-        self._name_var = tk.StringVar()
-        tk.Entry(g, textvariable=self._name_var, width=34).grid(
-            row=row, column=1, sticky="w", padx=4, pady=3)
-        tk.Label(g, text="(auto-added to keywords)",
-                 font=_hint, fg="gray").grid(row=row, column=2, sticky="w")
-
-        row += 1
-        tk.Label(g, text="Naming Pattern: *",
-                 font=("Courier", 9, "bold")).grid(
-            row=row, column=0, sticky="w", padx=4, pady=3)
-        self._naming_var = tk.StringVar(value="{original_name}_{date}")
-        tk.Entry(g, textvariable=self._naming_var, width=34).grid(
-            row=row, column=1, sticky="w", padx=4, pady=3)
-        tk.Label(g, text="{field_name} tokens",
-                 font=_hint, fg="gray").grid(row=row, column=2, sticky="w")
-
-        row += 1
-        tk.Label(g, text="Container Formats: *",
-                 font=("Courier", 9, "bold")).grid(
-            row=row, column=0, sticky="w", padx=4, pady=3)
-        self._formats_var = tk.StringVar()
-        tk.Entry(g, textvariable=self._formats_var, width=34).grid(
-            row=row, column=1, sticky="w", padx=4, pady=3)
-        tk.Label(g, text="e.g. .pdf,.docx",
-                 font=_hint, fg="gray").grid(row=row, column=2, sticky="w")
-
-        row += 1
-        tk.Label(g, text="Destination Subfolder:",
-                 font=("Courier", 9)).grid(
-            row=row, column=0, sticky="w", padx=4, pady=3)
-        self._dest_var = tk.StringVar()
-        tk.Entry(g, textvariable=self._dest_var, width=34).grid(
-            row=row, column=1, sticky="w", padx=4, pady=3)
-        tk.Label(g, text="(optional)",
-                 font=_hint, fg="gray").grid(row=row, column=2, sticky="w")
-
-        row += 1
-        tk.Label(g, text="Content Patterns:",
-                 font=("Courier", 9)).grid(
-            row=row, column=0, sticky="nw", padx=4, pady=3)
-        self._patterns_text = tk.Text(g, width=34, height=3,
-                                      font=("Courier", 9))
-        self._patterns_text.grid(row=row, column=1, sticky="w", padx=4, pady=3)
-        tk.Label(g, text="one regex/line (optional)",
-                 font=_hint, fg="gray").grid(row=row, column=2, sticky="nw")
-
-        row += 1
-        tk.Label(g, text="MIME Types:",
-                 font=("Courier", 9)).grid(
-            row=row, column=0, sticky="w", padx=4, pady=3)
-        self._mime_var = tk.StringVar()
-        tk.Entry(g, textvariable=self._mime_var, width=34).grid(
-            row=row, column=1, sticky="w", padx=4, pady=3)
-        tk.Label(g, text="comma-sep (optional)",
-                 font=_hint, fg="gray").grid(row=row, column=2, sticky="w")
+        for row, (label, attr, default, hint, required) in enumerate(
+                _DTYPE_FIELDS):
+            text_box = default is None
+            sticky = "nw" if text_box else "w"
+            tk.Label(g, text=f"{label} *" if required else label,
+                     font=_LABEL_FONT_REQUIRED if required else _LABEL_FONT,
+                     ).grid(row=row, column=0, sticky=sticky, padx=4, pady=3)
+            if text_box:
+                widget = tk.Text(g, width=34, height=3, font=("Courier", 9))
+                setattr(self, attr, widget)
+            else:
+                var = tk.StringVar(value=default)
+                setattr(self, attr, var)
+                widget = tk.Entry(g, textvariable=var, width=34)
+            widget.grid(row=row, column=1, sticky="w", padx=4, pady=3)
+            tk.Label(g, text=hint, font=_HINT_FONT, fg="gray").grid(
+                row=row, column=2, sticky=sticky)
 
     # ------------------------------------------------------------------
     # Section: Keywords to Identify Doc_Type (right column)
@@ -481,29 +582,42 @@ class DefineTab(tk.Frame):
     # ------------------------------------------------------------------
 
     def _build_section_fields(self, parent):
-        # Grid for table-style field rows
-        self._fields_grid = tk.Frame(parent)
-        self._fields_grid.pack(fill=tk.X)
-        self._fields_grid.columnconfigure(3, weight=1)  # patterns stretches
-        self._fields_next_grid_row = 1
-        self._build_fields_grid_headers()
-
-        tk.Button(parent, text="+ Add Field", font=("Courier", 8),
-                  command=self._add_field_row).pack(anchor="w", pady=(6, 0))
-
-    def _build_fields_grid_headers(self):
-        """Create column headers in the extract fields grid."""
-        g = self._fields_grid
-        for col, name in enumerate(["keyword", "field name", "field type",
-                                     "patterns"]):
-            tk.Label(g, text=name, font=("Courier", 7, "bold")).grid(
-                row=0, column=col, padx=4, sticky="w")
-        tk.Label(g, text="req", font=("Courier", 7, "bold")).grid(
-            row=0, column=4, padx=2)
-        tk.Label(g, text="opt", font=("Courier", 7, "bold")).grid(
-            row=0, column=5, padx=2)
-        tk.Label(g, text="name_ref", font=("Courier", 7, "bold")).grid(
-            row=0, column=6, padx=2)
+        # One Treeview holds every field row; cells are edited in place
+        # through a single shared overlay widget instead of per-row widgets
+        cols = ("keyword", "name", "type", "patterns", "required", "name_ref")
+        tree_frame = tk.Frame(parent)
+        tree_frame.pack(fill=tk.X)
+        self._fields_tree = ttk.Treeview(tree_frame, columns=cols,
+                                         show="headings", height=6,
+                                         selectmode="extended")
+        for col, text, width, stretch in (
+                ("keyword", "keyword", 90, False),
+                ("name", "field name", 100, False),
+                ("type", "field type", 80, False),
+                ("patterns", "patterns", 180, True),
+                ("required", "req/opt", 50, False),
+                ("name_ref", "name_ref", 60, False)):
+            self._fields_tree.heading(col, text=text, anchor="w")
+            self._fields_tree.column(
+                col, width=width, minwidth=40, stretch=stretch,
+                anchor="center" if col in ("required", "name_ref") else "w")
+        fields_sb = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL,
+                                  command=self._fields_tree.yview)
+        self._fields_tree.configure(yscrollcommand=fields_sb.set)
+        fields_sb.pack(side=tk.RIGHT, fill=tk.Y)
+        self._fields_tree.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self._fields_tree.bind("<Double-1>", self._on_field_cell_edit)
+        self._fields_tree.bind("<ButtonRelease-1>", self._on_field_cell_click)
+        self._fields_tree.bind("<Delete>",
+                               lambda e: self._remove_selected_fields())
+
+        btn_frame = tk.Frame(parent)
+        btn_frame.pack(anchor="w", pady=(6, 0))
+        tk.Button(btn_frame, text="+ Add Field", font=("Courier", 8),
+                  command=self._add_field_row).pack(side=tk.LEFT)
+        tk.Button(btn_frame, text="Remove Selected", font=("Courier", 8),
+                  command=self._remove_selected_fields).pack(
+            side=tk.LEFT, padx=(8, 0))
 
     # ------------------------------------------------------------------
     # Section: Staging Field Mapping (right column, bottom)
@@ -519,7 +633,6 @@ class DefineTab(tk.Frame):
         staging_frame = tk.Frame(parent)
         staging_frame.pack(fill=tk.X)
 
-        self._staging_vars = {}
         for i, slot in enumerate(_STAGING_SLOTS):
             tk.Label(staging_frame, text=f"{slot}:",
                      font=("Courier", 8)).grid(
@@ -529,26 +642,92 @@ class DefineTab(tk.Frame):
             combo.grid(row=i, column=1, sticky="w", padx=4, pady=2)
             self._staging_vars[slot] = (var, combo)
 
+    def _build_staging_on_expand(self, parent):
+        self._build_section_staging(parent)
+        # Combos start empty; push the current keywords + field names
+        self._staging_values = None
+        self._refresh_staging_combos()
+
     # ------------------------------------------------------------------
-    # Mousewheel helper
+    # Scroll region / mousewheel helpers
     # ------------------------------------------------------------------
 
-    def _bind_mousewheel(self, canvas):
-        """Bind mousewheel scrolling to the given canvas."""
-        canvas.bind("<Enter>", lambda e: self.bind_all(
-            "<MouseWheel>",
-            lambda ev: canvas.yview_scroll(
-                int(-1 * (ev.delta / 120)), "units"),
-        ))
+    @staticmethod
+    def _bind_scrollregion(canvas, inner):
+        """Keep *canvas*'s scrollregion equal to the size of *inner*.
+
+        The inner frame is the canvas's only item at (0, 0), so its
+        <Configure> size is the region; no bbox("all") query is needed.
+        A burst of layout passes applies only the last size, once, at the
+        next idle moment.
+        """
+        state = {"size": None, "applied": None, "pending": False}
+
+        def apply():
+            state["pending"] = False
+            if state["size"] != state["applied"] and canvas.winfo_exists():
+                state["applied"] = state["size"]
+                canvas.configure(scrollregion=(0, 0) + state["size"])
+
+        def on_configure(e):
+            state["size"] = (e.width, e.height)
+            if not state["pending"]:
+                state["pending"] = True
+                canvas.after_idle(apply)
+
+        inner.bind("<Configure>", on_configure)
+
+    def _register_scroll_canvas(self, canvas):
+        """Let the shared wheel handler scroll *canvas*."""
+        self._scroll_canvases[canvas] = 0
+        canvas.bind("<Destroy>",
+                    lambda e: self._scroll_canvases.pop(canvas, None))
+
+    def _on_wheel(self, ev):
+        """Route a wheel event to the registered canvas under the pointer.
+
+        Deltas are summed and applied as one scroll (one redraw) per
+        canvas at the next idle moment.
+        """
+        try:
+            w = self.winfo_containing(ev.x_root, ev.y_root)
+        except KeyError:
+            return  # pointer over a Tcl-only widget (e.g. a combobox popdown)
+        while w is not None and w not in self._scroll_canvases:
+            w = w.master
+        if w is None:
+            return
+        self._scroll_canvases[w] += ev.delta
+        if not self._wheel_flush_pending:
+            self._wheel_flush_pending = True
+            self.after_idle(self._flush_wheel)
+
+    def _flush_wheel(self):
+        self._wheel_flush_pending = False
+        for canvas, delta in self._scroll_canvases.items():
+            units = int(-delta / 120)
+            self._scroll_canvases[canvas] = 0
+            if units:
+                canvas.yview_scroll(units, "units")
 
     # ------------------------------------------------------------------
     # Search in extracted text
     # ------------------------------------------------------------------
 
     def _collect_search_matches(self, query):
-        """Find all match positions for *query* and highlight them."""
+        """Find all match positions for *query* and highlight them.
+
+        Returns sorted (line, col) tuples.  The scan and highlighting only
+        run when the query differs from the cached one; the cache is
+        dropped whenever the preview text is replaced.
+        """
+        if self._search_cache is not None and self._search_cache[0] == query:
+            return self._search_cache[1]
         preview = self._text_preview
-        preview.tag_remove("search_hl", "1.0", tk.END)
+        if self._search_cache is not None and self._search_cache[1]:
+            # Only the cached query can have left highlights; replacing the
+            # text drops both the tags and the cache
+            preview.tag_remove("search_hl", "1.0", tk.END)
         positions = []
         start = "1.0"
         while True:
@@ -557,51 +736,47 @@ class DefineTab(tk.Frame):
                 break
             end = f"{pos}+{len(query)}c"
             preview.tag_add("search_hl", pos, end)
-            positions.append(pos)
+            line, col = pos.split(".")
+            positions.append((int(line), int(col)))
             start = end
+        self._search_cache = (query, positions)
         return positions
 
+    def _search_goto(self, positions, index):
+        line, col = self._search_pos = positions[index % len(positions)]
+        self._text_preview.see(f"{line}.{col}")
+
     def _search_next(self):
         """Find next match after current position, wrap at end."""
         query = self._search_var.get().strip()
         if not query or not self._text_preview:
             return
-        preview = self._text_preview
         positions = self._collect_search_matches(query)
         if not positions:
-            self._search_pos = "1.0"
+            self._search_pos = None
             return
-        # Find first match strictly after current position
-        target = None
-        for pos in positions:
-            if preview.compare(pos, ">=", self._search_pos):
-                target = pos
-                break
-        if target is None:
-            target = positions[0]  # wrap to first
-        preview.see(target)
-        self._search_pos = f"{target}+1c"
+        # First match strictly after the current one (wraps to first)
+        if self._search_pos is None:
+            index = 0
+        else:
+            index = bisect.bisect_right(positions, self._search_pos)
+        self._search_goto(positions, index)
 
     def _search_prev(self):
         """Find previous match before current position, wrap at beginning."""
         query = self._search_var.get().strip()
         if not query or not self._text_preview:
             return
-        preview = self._text_preview
         positions = self._collect_search_matches(query)
         if not positions:
-            self._search_pos = "1.0"
+            self._search_pos = None
             return
-        # Find last match strictly before current position
-        target = None
-        for pos in reversed(positions):
-            if preview.compare(f"{pos}+1c", "<", self._search_pos):
-                target = pos
-                break
-        if target is None:
-            target = positions[-1]  # wrap to last
-        preview.see(target)
-        self._search_pos = f"{target}+1c"
+        # Last match strictly before the current one (wraps to last)
+        if self._search_pos is None:
+            index = -1
+        else:
+            index = bisect.bisect_left(positions, self._search_pos) - 1
+        self._search_goto(positions, index)
 
     # ------------------------------------------------------------------
     # Populate helpers
@@ -609,27 +784,25 @@ class DefineTab(tk.Frame):
 
     def _populate_text_preview(self):
         """Fill extracted text section with document text."""
-        self._text_preview.config(state=tk.NORMAL)
-        self._text_preview.delete("1.0", tk.END)
-        self._text_preview.insert("1.0", (self._extracted_text or "")[:5000])
-        self._search_pos = "1.0"
+        # One Tcl call; the preview is read-only by key filtering, never
+        # state=disabled, so no state toggle is needed around it
+        self._text_preview.replace("1.0", tk.END,
+                                   (self._extracted_text or "")[:5000])
+        self._search_pos = None
+        self._search_cache = None
 
     def _populate_population(self):
         """Fill keyword population with top 20 keywords from analysis."""
-        for w in self._kw_grid.winfo_children():
-            w.destroy()
-        self._build_kw_grid_headers()
-        self._kw_next_grid_row = 1
-        self._kw_route_rows = []
+        self._kw_tree.delete(*self._kw_tree.get_children())
+        self._kw_route_rows = {}
+        self._kw_displayed_lower = set()
         self._kw_deleted = set()
         self._processed_extracts = set()
 
-        if not self._doc_analysis:
-            return
-
-        kw_pool = self._doc_analysis.get("suggested_keywords", [])
-        for kw in kw_pool[:20]:
-            self._add_kw_to_population(kw)
+        if self._doc_analysis:
+            kw_pool = self._doc_analysis.get("suggested_keywords", [])
+            for kw in kw_pool[:20]:
+                self._add_kw_to_population(kw)
         self._update_kw_count()
 
     # ------------------------------------------------------------------
@@ -658,78 +831,46 @@ class DefineTab(tk.Frame):
     # ------------------------------------------------------------------
 
     def _add_kw_to_population(self, kw):
-        """Add a keyword row with checkbuttons to the population grid."""
-        displayed = {r["kw"].lower() for r in self._kw_route_rows}
-        if (kw.lower() in displayed
-                or kw.lower() in {d.lower() for d in self._kw_deleted}):
+        """Add a keyword row, routed to skip, to the population tree."""
+        kw_l = kw.lower()
+        if kw_l in self._kw_displayed_lower or kw_l in self._kw_deleted:
             return
+        self._kw_displayed_lower.add(kw_l)
+        iid = self._kw_tree.insert("", tk.END, values=(kw, "skip"))
+        self._kw_route_rows[iid] = {"kw": kw, "route": "skip"}
+
+    def _on_kw_route_click(self, event):
+        """Cycle the route of the row whose route cell was clicked."""
+        tree = self._kw_tree
+        if tree.identify_region(event.x, event.y) != "cell":
+            return
+        if tree.identify_column(event.x) != "#2":
+            return
+        iid = tree.identify_row(event.y)
+        if not iid:
+            return
+        # Tags and extract can be combined; skip excludes both
+        row = self._kw_route_rows[iid]
+        row["route"] = _KW_ROUTES[
+            (_KW_ROUTES.index(row["route"]) + 1) % len(_KW_ROUTES)]
+        tree.set(iid, "route", row["route"])
 
-        r = self._kw_next_grid_row
-        self._kw_next_grid_row += 1
-        g = self._kw_grid
-        widgets = []
-
-        # Delete button (trashcan)
-        btn = tk.Button(
-            g, text="\U0001f5d1", font=("Segoe UI Emoji", 8),
-            width=3, fg="red",
-        )
-        btn.grid(row=r, column=0, padx=(0, 2), pady=1)
-        widgets.append(btn)
-
-        # Keyword label
-        lbl = tk.Label(g, text=kw, font=("Courier", 8, "bold"), anchor="w")
-        lbl.grid(row=r, column=1, sticky="w", pady=1)
-        widgets.append(lbl)
-
-        # Checkbuttons — tags/extract non-exclusive, both exclusive from skip
-        tags_var = tk.BooleanVar(value=False)
-        extract_var = tk.BooleanVar(value=False)
-        skip_var = tk.BooleanVar(value=True)
-
-        def on_tags_toggle(tv=tags_var, sv=skip_var):
-            if tv.get():
-                sv.set(False)
-
-        def on_extract_toggle(ev=extract_var, sv=skip_var):
-            if ev.get():
-                sv.set(False)
-
-        def on_skip_toggle(tv=tags_var, ev=extract_var, sv=skip_var):
-            if sv.get():
-                tv.set(False)
-                ev.set(False)
-
-        cb_tags = tk.Checkbutton(g, variable=tags_var, command=on_tags_toggle)
-        cb_tags.grid(row=r, column=2, pady=1)
-        widgets.append(cb_tags)
-
-        cb_extract = tk.Checkbutton(g, variable=extract_var,
-                                    command=on_extract_toggle)
-        cb_extract.grid(row=r, column=3, pady=1)
-        widgets.append(cb_extract)
-
-        cb_skip = tk.Checkbutton(g, variable=skip_var, command=on_skip_toggle)
-        cb_skip.grid(row=r, column=4, pady=1)
-        widgets.append(cb_skip)
-
-        row_data = {
-            "kw": kw, "tags_var": tags_var, "extract_var": extract_var,
-            "skip_var": skip_var, "widgets": widgets,
-        }
-        btn.config(command=lambda rd=row_data: self._remove_kw_from_population(rd))
-        self._kw_route_rows.append(row_data)
-
-    def _remove_kw_from_population(self, row_data):
+    def _remove_kw_from_population(self, iid):
         """Delete a keyword row from population and track deletion."""
-        for w in row_data["widgets"]:
-            w.destroy()
-        self._kw_route_rows = [
-            r for r in self._kw_route_rows if r is not row_data
-        ]
-        self._kw_deleted.add(row_data["kw"])
+        self._kw_tree.delete(iid)
+        self._forget_population_kw(self._kw_route_rows.pop(iid)["kw"])
+
+    def _remove_selected_population(self):
+        for iid in self._kw_tree.selection():
+            self._remove_kw_from_population(iid)
         self._update_kw_count()
 
+    def _forget_population_kw(self, kw):
+        """Mark *kw* deleted so it is not offered again."""
+        kw_l = kw.lower()
+        self._kw_displayed_lower.discard(kw_l)
+        self._kw_deleted.add(kw_l)
+
     def _update_kw_count(self):
         count = len(self._kw_route_rows)
         self._kw_count_label.config(text=f"Showing {count} keywords")
@@ -744,20 +885,20 @@ class DefineTab(tk.Frame):
         self._update_kw_count()
 
     def _process_population(self):
-        """Execute routing for all keywords based on checkbox selection.
+        """Execute routing for all keywords based on each row's route.
 
-        - skip (or nothing selected): remove from population
+        - skip: remove from population
         - tags: add to classification keywords
         - extract: create extraction field row with keyword prepopulation
         Tags and extract can both be selected for the same keyword.
         """
         to_remove = []
 
-        for row in list(self._kw_route_rows):
+        for iid, row in self._kw_route_rows.items():
             kw = row["kw"]
-            is_tags = row["tags_var"].get()
-            is_extract = row["extract_var"].get()
-            is_skip = row["skip_var"].get() or (not is_tags and not is_extract)
+            route = row["route"]
+            is_tags = route in ("tags", "tags+extract")
+            is_extract = route in ("extract", "tags+extract")
 
             if is_tags:
                 self._add_kw_to_keywords(kw)
@@ -767,17 +908,12 @@ class DefineTab(tk.Frame):
                     self._add_field_row(name=kw, patterns=pattern,
                                         keyword=kw, field_type=field_type)
                     self._processed_extracts.add(kw)
-            if is_skip and not is_tags and not is_extract:
-                to_remove.append(row)
+            if not is_tags and not is_extract:
+                to_remove.append(iid)
 
         # Remove skipped rows from population
-        for row in to_remove:
-            for w in row["widgets"]:
-                w.destroy()
-            self._kw_route_rows = [
-                r for r in self._kw_route_rows if r is not row
-            ]
-            self._kw_deleted.add(row["kw"])
+        for iid in to_remove:
+            self._remove_kw_from_population(iid)
 
         self._update_kw_count()
         self._refresh_staging_combos()
@@ -788,80 +924,22 @@ class DefineTab(tk.Frame):
 
     def _keyword_to_field(self, keyword):
         """Convert a keyword to (field_name, pattern, ref_role, field_type)."""
-        field_name = re.sub(r"[^a-z0-9]+", "_", keyword.lower()).strip("_")
         kw_lower = keyword.lower()
+        field_name = _generate_entity_key(keyword)
 
-        if "date" in kw_lower:
-            field_type = "date"
-            ref_role = ""
-        elif any(w in kw_lower for w in (
-            "amount", "total", "balance", "charge", "price", "cost", "due",
-        )):
-            field_type = "currency"
-            ref_role = ""
-        elif any(w in kw_lower for w in (
-            "number", "num", "no", "id", "ref", "invoice", "po", "order",
-        )):
-            field_type = "reference"
-            ref_role = ""
-        elif any(w in kw_lower for w in (
-            "address", "remit to", "mail to", "street", "location",
-        )):
-            field_type = "address"
-            ref_role = ""
-        elif any(w in kw_lower for w in (
-            "vendor", "remit", "from", "sold by", "supplier",
-        )):
-            field_type = "name"
-            ref_role = "vendor"
-        elif any(w in kw_lower for w in (
-            "customer", "client", "bill to", "prepared for", "ship to",
-        )):
-            field_type = "name"
-            ref_role = "customer"
-        elif "name" in kw_lower:
-            field_type = "name"
-            ref_role = "vendor"
-        elif any(w in kw_lower for w in ("phone", "fax", "tel", "mobile", "cell")):
-            field_type = "phone"
-            ref_role = ""
-        elif any(w in kw_lower for w in ("email", "e-mail")):
-            field_type = "email"
-            ref_role = ""
-        elif any(w in kw_lower for w in ("percent", "%", "rate", "ratio")):
-            field_type = "percentage"
-            ref_role = ""
-        elif any(w in kw_lower for w in ("url", "website", "link", "http")):
-            field_type = "url"
-            ref_role = ""
-        else:
-            field_type = "text"
-            ref_role = ""
+        field_type, ref_role = "text", ""
+        for rule_re, rule_type, rule_role in _FIELD_TYPE_RULES:
+            if rule_re.search(kw_lower):
+                field_type, ref_role = rule_type, rule_role
+                break
 
         pattern = self._generate_pattern(keyword, field_type)
         return field_name, pattern, ref_role, field_type
 
     def _generate_pattern(self, field_name, field_type):
         """Generate a regex pattern based on field name and field type."""
-        safe_label = re.escape(field_name)
-        if field_type == "date":
-            return safe_label + r"[:\s]*(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})"
-        elif field_type == "currency":
-            return safe_label + r"[:\s]*\$?([\d,]+\.\d{2})"
-        elif field_type == "reference":
-            return safe_label + r"[:\s]*([A-Za-z0-9][\-A-Za-z0-9]+)"
-        elif field_type == "address":
-            return safe_label + r"[:\s]*(.*?)$"
-        elif field_type == "phone":
-            return safe_label + r"[:\s]*(\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{4})"
-        elif field_type == "email":
-            return safe_label + r"[:\s]*([A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,})"
-        elif field_type == "percentage":
-            return safe_label + r"[:\s]*(\d+\.?\d*\s?%)"
-        elif field_type == "url":
-            return safe_label + r"[:\s]*(https?://\S+)"
-        else:  # text, name
-            return safe_label + r"[:\s]*(.+?)\s*$"
+        return re.escape(field_name) + _PATTERN_SUFFIXES.get(
+            field_type, _TEXT_PATTERN_SUFFIX)
 
     # ------------------------------------------------------------------
     # Classification keyword management (right column)
@@ -893,116 +971,163 @@ class DefineTab(tk.Frame):
 
     def _add_field_row(self, name="", patterns="", required=True,
                        keyword="", field_type="text", **_kwargs):
-        """Add a new extraction field row in the grid table.
+        """Add a new extraction field row to the fields tree.
 
-        Columns: keyword | field name | field type | patterns | req | opt | name_ref | delete
+        Columns: keyword | field name | field type | patterns | req/opt | name_ref
+        Double-click edits name, type and patterns; a single click on the
+        req/opt or name_ref cell toggles it.
         """
-        r = self._fields_next_grid_row
-        self._fields_next_grid_row += 1
-        g = self._fields_grid
-        widgets = []
-
-        # Col 0: keyword (read-only label)
-        kw_lbl = tk.Label(g, text=keyword, font=("Courier", 8, "bold"),
-                          fg="#4a90d9", anchor="w")
-        kw_lbl.grid(row=r, column=0, padx=4, sticky="w", pady=2)
-        widgets.append(kw_lbl)
-
-        # Col 1: field name (editable, prepopulated with keyword)
-        name_var = tk.StringVar(value=name if name else keyword)
-        name_entry = tk.Entry(g, textvariable=name_var, width=14,
-                              font=("Courier", 8))
-        name_entry.grid(row=r, column=1, padx=4, sticky="w", pady=2)
-        widgets.append(name_entry)
-
-        # Col 2: field type (dropdown)
-        type_var = tk.StringVar(value=field_type)
-        type_combo = ttk.Combobox(
-            g, textvariable=type_var, width=10,
-            values=["text", "date", "currency", "reference", "name",
-                    "address", "phone", "email", "percentage", "url"],
-            state="readonly",
-        )
-        type_combo.grid(row=r, column=2, padx=4, sticky="w", pady=2)
-        widgets.append(type_combo)
-
-        # Col 3: patterns (editable)
-        patterns_var = tk.StringVar(value=patterns)
-        patterns_entry = tk.Entry(g, textvariable=patterns_var, width=24,
-                                  font=("Courier", 8))
-        patterns_entry.grid(row=r, column=3, padx=4, sticky="ew", pady=2)
-        widgets.append(patterns_entry)
-
-        # Col 4: req radio
-        req_var = tk.StringVar(value="req" if required else "opt")
-        req_rb = tk.Radiobutton(g, variable=req_var, value="req")
-        req_rb.grid(row=r, column=4, padx=2, pady=2)
-        widgets.append(req_rb)
-
-        # Col 5: opt radio
-        opt_rb = tk.Radiobutton(g, variable=req_var, value="opt")
-        opt_rb.grid(row=r, column=5, padx=2, pady=2)
-        widgets.append(opt_rb)
-
-        # Col 6: name_ref checkbox
-        name_ref_var = tk.BooleanVar(value=False)
-        nref_cb = tk.Checkbutton(g, variable=name_ref_var)
-        nref_cb.grid(row=r, column=6, padx=2, pady=2)
-        widgets.append(nref_cb)
-
-        # Col 7: delete button
-        del_btn = tk.Button(g, text="\U0001f5d1", font=("Segoe UI Emoji", 8),
-                            width=3, fg="red")
-        del_btn.grid(row=r, column=7, padx=2, pady=2)
-        widgets.append(del_btn)
-
+        self._expand_section("fields")
         row_data = {
-            "widgets": widgets,
-            "name": name_var,
-            "patterns": patterns_var,
-            "required": req_var,
-            "name_ref": name_ref_var,
-            "type": type_var,
+            "name": name if name else keyword,
+            "patterns": patterns,
+            "required": bool(required),
+            "name_ref": False,
+            "type": field_type,
             "keyword": keyword,
         }
-        del_btn.config(command=lambda: self._remove_field_row(row_data))
+        iid = self._fields_tree.insert(
+            "", tk.END, values=self._field_row_values(row_data))
+        self._field_rows[iid] = row_data
+        self._refresh_staging_combos()
 
-        # Regenerate patterns when field type changes
-        def regenerate_patterns(event=None):
-            fn = name_var.get().strip()
-            ft = type_var.get()
-            if fn:
-                patterns_var.set(self._generate_pattern(fn, ft))
-        type_combo.bind("<<ComboboxSelected>>", regenerate_patterns)
+    @staticmethod
+    def _field_row_values(row_data):
+        return (
+            row_data["keyword"],
+            row_data["name"],
+            row_data["type"],
+            row_data["patterns"],
+            "req" if row_data["required"] else "opt",
+            "\u2611" if row_data["name_ref"] else "\u2610",
+        )
 
-        self._field_rows.append(row_data)
+    def _update_field_row(self, iid, **changes):
+        row_data = self._field_rows[iid]
+        row_data.update(changes)
+        self._fields_tree.item(iid, values=self._field_row_values(row_data))
+        if "name" in changes:
+            self._refresh_staging_combos()
 
+    def _remove_field_row(self, iid):
+        self._close_field_editor()
+        self._fields_tree.delete(iid)
+        del self._field_rows[iid]
         self._refresh_staging_combos()
-        name_var.trace_add("write", lambda *_: self._refresh_staging_combos())
 
-    def _remove_field_row(self, row_data):
-        for w in row_data["widgets"]:
-            w.destroy()
-        self._field_rows.remove(row_data)
-        self._refresh_staging_combos()
+    def _remove_selected_fields(self):
+        for iid in self._fields_tree.selection():
+            self._remove_field_row(iid)
+
+    def _field_cell_at(self, event):
+        """Return (iid, column name) under the pointer, or (None, None)."""
+        tree = self._fields_tree
+        if tree.identify_region(event.x, event.y) != "cell":
+            return None, None
+        iid = tree.identify_row(event.y)
+        col = tree.identify_column(event.x)  # "#1", "#2", ...
+        if not iid or not col:
+            return None, None
+        return iid, tree["columns"][int(col[1:]) - 1]
+
+    def _on_field_cell_click(self, event):
+        iid, col = self._field_cell_at(event)
+        if iid is None:
+            return
+        row_data = self._field_rows[iid]
+        if col == "required":
+            self._update_field_row(iid, required=not row_data["required"])
+        elif col == "name_ref":
+            self._update_field_row(iid, name_ref=not row_data["name_ref"])
+
+    def _on_field_cell_edit(self, event):
+        iid, col = self._field_cell_at(event)
+        if col not in ("name", "type", "patterns"):
+            return
+        bbox = self._fields_tree.bbox(iid, col)
+        if not bbox:
+            return  # cell scrolled out of view
+        self._close_field_editor()
+        x, y, w, h = bbox
+        row_data = self._field_rows[iid]
+        var = tk.StringVar(value=row_data[col])
+
+        if col == "type":
+            editor = ttk.Combobox(
+                self._fields_tree, textvariable=var,
+                values=["text", "date", "currency", "reference", "name",
+                        "address", "phone", "email", "percentage", "url"],
+                state="readonly",
+            )
+
+            def commit_type(event=None):
+                ft = var.get()
+                self._close_field_editor()
+                fn = row_data["name"].strip()
+                changes = {"type": ft}
+                # Regenerate patterns when field type changes
+                if fn and ft != row_data["type"]:
+                    changes["patterns"] = self._generate_pattern(fn, ft)
+                self._update_field_row(iid, **changes)
+            editor.bind("<<ComboboxSelected>>", commit_type)
+        else:
+            editor = tk.Entry(self._fields_tree, textvariable=var,
+                              font=("Courier", 8))
+            editor.select_range(0, tk.END)
+
+            def commit_text(event=None):
+                if self._field_editor is not editor:
+                    return  # already closed by Escape or another edit
+                value = var.get()
+                self._close_field_editor()
+                if value != row_data[col]:
+                    self._update_field_row(iid, **{col: value})
+            editor.bind("<Return>", commit_text)
+            editor.bind("<FocusOut>", commit_text)
+
+        editor.bind("<Escape>", lambda e: self._close_field_editor())
+        editor.place(x=x, y=y, width=w, height=h)
+        editor.focus_set()
+        self._field_editor = editor
+
+    def _close_field_editor(self):
+        if self._field_editor is not None:
+            editor, self._field_editor = self._field_editor, None
+            editor.destroy()
 
     # ------------------------------------------------------------------
     # Staging combo refresh
     # ------------------------------------------------------------------
 
     def _refresh_staging_combos(self):
+        """Schedule a staging dropdown update for the next idle moment.
+
+        Bulk row additions and per-keystroke name traces all collapse into
+        a single update.
+        """
+        if self._staging_refresh_pending:
+            return
+        self._staging_refresh_pending = True
+        self.after_idle(self._do_refresh_staging_combos)
+
+    def _do_refresh_staging_combos(self):
         """Update staging dropdowns with keywords + field names."""
+        self._staging_refresh_pending = False
+        if not self._staging_vars:
+            return  # staging section not built yet
         # Collect field names
-        field_names = [r["name"].get() for r in self._field_rows
-                       if r["name"].get()]
+        field_names = [r["name"] for r in self._field_rows.values()
+                       if r["name"]]
         # Collect keywords
         keywords = list(self._kw_listbox.get(0, tk.END))
         # Merge, dedupe, sort
         all_values = sorted(set(field_names + keywords))
         values = [""] + all_values
+        if values == self._staging_values:
+            return  # configuring identical values is still a Tcl round-trip
+        self._staging_values = values
 
         for slot, (var, combo) in self._staging_vars.items():
-            current = var.get()
             combo["values"] = values
             # Keep current value even if it's manual (combobox is editable)
 
@@ -1014,12 +1139,8 @@ class DefineTab(tk.Frame):
         """Gather all form inputs into (type_name, type_def)."""
         type_name = self._name_var.get().strip().lower()
 
-        container_formats = [
-            s.strip() for s in self._formats_var.get().split(",") if s.strip()
-        ]
-        mime_types = [
-            s.strip() for s in self._mime_var.get().split(",") if s.strip()
-        ]
+        container_formats = _TOK_RE.findall(self._formats_var.get())
+        mime_types = _TOK_RE.findall(self._mime_var.get())
 
         # Keywords from listbox
         content_keywords = list(self._kw_listbox.get(0, tk.END))
@@ -1032,7 +1153,7 @@ class DefineTab(tk.Frame):
 
         content_patterns = [
             line.strip()
-            for line in self._patterns_text.get("1.0", "end").splitlines()
+            for line in self._patterns_text.get("1.0", "end-1c").splitlines()
             if line.strip()
         ]
         keyword_threshold = self._threshold_var.get()
@@ -1041,21 +1162,26 @@ class DefineTab(tk.Frame):
 
         # Build extraction_fields
         extraction_fields = {}
-        for row in self._field_rows:
-            fname = row["name"].get().strip()
+        # Tree order is display order (respects any future tree.move());
+        # no tree yet means the extract section was never opened
+        field_iids = (self._fields_tree.get_children()
+                      if self._fields_tree is not None else ())
+        for iid in field_iids:
+            row = self._field_rows[iid]
+            fname = row["name"].strip()
             if not fname:
                 continue
             pats = [
                 p.strip()
-                for p in row["patterns"].get().split(";") if p.strip()
+                for p in row["patterns"].split(";") if p.strip()
             ]
-            ft = row["type"].get()
+            ft = row["type"]
             field_cfg = {
                 "patterns": pats,
-                "required": row["required"].get() == "req",
+                "required": row["required"],
                 "field_type": ft,
             }
-            if row["name_ref"].get():
+            if row["name_ref"]:
                 field_cfg["reference_lookup"] = {}
             extraction_fields[fname] = field_cfg
 
@@ -1147,43 +1273,43 @@ class DefineTab(tk.Frame):
             self._text_preview.config(state=tk.NORMAL)
             self._text_preview.delete("1.0", tk.END)
             self._text_preview.tag_remove("search_hl", "1.0", tk.END)
-        self._search_var.set("")
-        self._search_pos = "1.0"
+        self._search_pos = None
+        self._search_cache = None
 
         # Keyword population
-        for w in self._kw_grid.winfo_children():
-            w.destroy()
-        self._build_kw_grid_headers()
-        self._kw_next_grid_row = 1
-        self._kw_route_rows = []
+        self._kw_route_rows = {}
+        self._kw_displayed_lower = set()
         self._kw_deleted = set()
         self._processed_extracts = set()
-        self._kw_write_in.set("")
-        self._update_kw_count()
-
-        # Keywords listbox
-        self._kw_listbox.delete(0, tk.END)
-        self._threshold_var.set(2)
-        self._kw_add_var.set("")
+        if self._left_built:
+            self._search_var.set("")
+            self._kw_tree.delete(*self._kw_tree.get_children())
+            self._kw_write_in.set("")
+            self._update_kw_count()
 
         # Field rows
-        for row in list(self._field_rows):
-            for w in row["widgets"]:
-                w.destroy()
+        if self._fields_tree is not None:
+            self._close_field_editor()
+            self._fields_tree.delete(*self._fields_tree.get_children())
         self._field_rows.clear()
-        self._fields_next_grid_row = 1
 
         # Staging
         for slot, (var, combo) in self._staging_vars.items():
             var.set("")
 
-        # Doc_type fields
-        self._name_var.set("")
-        self._naming_var.set("{original_name}_{date}")
-        self._formats_var.set("")
-        self._dest_var.set("")
-        self._patterns_text.delete("1.0", tk.END)
-        self._mime_var.set("")
+        if self._right_built:
+            # Keywords listbox
+            self._kw_listbox.delete(0, tk.END)
+            self._threshold_var.set(2)
+            self._kw_add_var.set("")
+
+            # Doc_type fields
+            self._name_var.set("")
+            self._naming_var.set("{original_name}_{date}")
+            self._formats_var.set("")
+            self._dest_var.set("")
+            self._patterns_text.delete("1.0", tk.END)
+            self._mime_var.set("")
 
         # Error + context
         self._error_label.config(text="")
@@ -1,67 +1,24 @@
 # src/gui/intake_tab.py
 """Intake watcher tab — extracted from autofiler_gui.py."""
 
-import os
 import tkinter as tk
 from tkinter import scrolledtext
 import threading
 import time
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-from src.pipeline import process_file
+from src.intake_handler import IntakeHandler as BaseIntakeHandler
+from src.pipeline import create_intake_executor
 
-# Minimum seconds between processing the same file path
-_DEDUP_WINDOW = 5
 
+class IntakeHandler(BaseIntakeHandler):
+    """Intake handler that reports progress to the tab's activity log."""
 
-class IntakeHandler(FileSystemEventHandler):
-    """Handle new files arriving in the intake folder."""
-
-    def __init__(self, config, logger, log_callback):
-        self.config = config
-        self.logger = logger
+    def __init__(self, config, logger, log_callback, executor):
+        super().__init__(config, logger, executor)
         self.log_callback = log_callback
-        self._recently_processed: dict[str, float] = {}
-        self._lock = threading.Lock()
-
-    def on_created(self, event):
-        if event.is_directory:
-            return
-
-        file_path = os.path.normpath(event.src_path)
-
-        # Deduplicate: skip if this path was processed within the window
-        with self._lock:
-            now = time.monotonic()
-            last = self._recently_processed.get(file_path, 0)
-            if now - last < _DEDUP_WINDOW:
-                return
-            self._recently_processed[file_path] = now
-
-            # Prune old entries
-            cutoff = now - _DEDUP_WINDOW * 2
-            self._recently_processed = {
-                k: v for k, v in self._recently_processed.items()
-                if v > cutoff
-            }
-
-        self.log_callback(f"Detected: {file_path}")
-        time.sleep(1)
-
-        # Verify the file still exists (may have been moved by a prior event)
-        if not os.path.isfile(file_path):
-            self.log_callback(f"  Skipped (already moved): {file_path}")
-            return
 
-        try:
-            self.config.reload()
-            result = process_file(file_path, self.config, self.logger)
-            decision = result.get("routing", {}).get("decision", "unknown")
-            best = result.get("best_type", "none")
-            self.log_callback(f"  Processed: {decision} | type={best}")
-        except Exception as e:
-            # pipeline.py already logs errors before re-raising
-            self.log_callback(f"  ERROR: {e}")
+    def _log(self, message: str):
+        self.log_callback(message)
 
 
 class IntakeTab(tk.Frame):
@@ -75,6 +32,7 @@ class IntakeTab(tk.Frame):
         self.intake = self.config.settings["intake_path"]
 
         self.observer = None
+        self.executor = None
         self.running = False
 
         self._build_ui()
@@ -139,7 +97,9 @@ class IntakeTab(tk.Frame):
             return
         self.running = True
 
-        handler = IntakeHandler(self.config, self.af_logger, self._log)
+        self.executor = create_intake_executor(self.config.settings)
+        handler = IntakeHandler(self.config, self.af_logger, self._log,
+                                self.executor)
         self.observer = Observer()
         self.observer.schedule(handler, self.intake, recursive=False)
         self.observer.start()
@@ -150,7 +110,12 @@ class IntakeTab(tk.Frame):
         self.stop_btn.config(state=tk.NORMAL)
         self._log("Watcher started.")
 
-    def stop(self):
+    def stop(self, wait=False):
+        """Stop watching; queued files are dropped, running ones finish.
+
+        Reference writes are flushed once the running workers are done —
+        on a background thread, or before returning when *wait* is set.
+        """
         if not self.running:
             return
         self.running = False
@@ -160,6 +125,14 @@ class IntakeTab(tk.Frame):
             threading.Thread(target=self.observer.join, daemon=True).start()
             self.observer = None
 
+        if self.executor:
+            executor, self.executor = self.executor, None
+            if wait:
+                self._drain(executor)
+            else:
+                threading.Thread(target=self._drain, args=(executor,),
+                                 daemon=True).start()
+
         self.status_dot.config(fg="gray")
         self.status_label.config(text="Stopped")
         self.start_btn.config(state=tk.NORMAL)
@@ -168,4 +141,8 @@ class IntakeTab(tk.Frame):
 
     def shutdown(self):
         """Gracefully stop the watcher (called on app close)."""
-        self.stop()
+        self.stop(wait=True)
+
+    def _drain(self, executor):
+        executor.shutdown(wait=True, cancel_futures=True)
+        self.config.flush_references()
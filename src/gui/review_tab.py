@@ -16,9 +16,7 @@ from src.review_engine import (
     stage_file,
 )
 from src.config_learner import (
-    add_keywords_to_type,
-    add_patterns_to_type,
-    add_extraction_patterns,
+    batch_update,
     add_entity_reference,
     add_alias_to_entity,
     get_entity_names,
@@ -516,17 +514,15 @@ class ReviewTab(tk.Frame):
         # Approved patterns (always classification signals)
         approved_pat = [pat for pat, var in self._pat_check_vars if var.get()]
 
-        if approved_kw:
-            count = add_keywords_to_type(
-                self._assigned_type, approved_kw, self.config
-            )
-            self._learning_record["keywords_added"] = approved_kw[:count] if count else []
+        if approved_kw or approved_pat:
+            with batch_update(self.config) as batch:
+                if approved_kw:
+                    count = batch.add_keywords(self._assigned_type, approved_kw)
+                    self._learning_record["keywords_added"] = approved_kw[:count] if count else []
 
-        if approved_pat:
-            count = add_patterns_to_type(
-                self._assigned_type, approved_pat, self.config
-            )
-            self._learning_record["patterns_added"] = approved_pat[:count] if count else []
+                if approved_pat:
+                    count = batch.add_patterns(self._assigned_type, approved_pat)
+                    self._learning_record["patterns_added"] = approved_pat[:count] if count else []
 
         self._learning_record["entities_added"] = entities_added
 
@@ -710,14 +706,20 @@ class ReviewTab(tk.Frame):
 
     def _apply_learning_b(self):
         ext_pats_added = {}
-        for field_name, items in self._ext_pat_check_vars.items():
-            approved = [pat for pat, var in items if var.get()]
-            if approved:
-                count = add_extraction_patterns(
-                    self._assigned_type, field_name, approved, self.config
-                )
-                if count:
-                    ext_pats_added[field_name] = approved[:count]
+        approved_by_field = {
+            field_name: [pat for pat, var in items if var.get()]
+            for field_name, items in self._ext_pat_check_vars.items()
+        }
+        if any(approved_by_field.values()):
+            with batch_update(self.config) as batch:
+                for field_name, approved in approved_by_field.items():
+                    if not approved:
+                        continue
+                    count = batch.add_extraction_patterns(
+                        self._assigned_type, field_name, approved
+                    )
+                    if count:
+                        ext_pats_added[field_name] = approved[:count]
 
         if ext_pats_added:
             self._learning_record["extraction_patterns_added"] = ext_pats_added
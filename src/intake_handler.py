@@ -0,0 +1,173 @@
+# src/intake_handler.py
+"""Intake folder event handler shared by the CLI watcher and the GUI."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from watchdog.events import FileSystemEventHandler
+
+from src.guards import wait_for_stable_file
+from src.pipeline import process_file
+
+# Minimum seconds between processing the same file path
+_DEDUP_WINDOW = 5
+
+# Upper bound on remembered paths; the oldest entries are evicted first
+_DEDUP_MAX_ENTRIES = 4096
+
+# Quiet period (seconds) after the last event before pending paths are flushed
+_COALESCE_LATENCY = 0.25
+
+# Longest a path waits in a batch while events keep arriving
+_COALESCE_MAX_DELAY = 1.0
+
+
+def _event_key(file_path: str) -> tuple | None:
+    """Return a (path, size, mtime bucket) signature, or None if the file is gone."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (file_path, st.st_size, int(st.st_mtime * 10))
+
+
+class IntakeHandler(FileSystemEventHandler):
+    """Handle new files arriving in the intake folder.
+
+    Event callbacks only schedule work; the pipeline runs on *executor*
+    so a slow OCR never blocks the watchdog thread.
+
+    Windows emits create/modify/modify (and rename) bursts for a single
+    logical write, and bulk copies deliver many paths at once.  Events are
+    queued and flushed together once the intake folder goes quiet briefly,
+    so each path reaches ``_handle`` once per burst.
+
+    Progress messages go through ``_log``, a no-op here; the GUI
+    subclass routes them to its activity log.
+    """
+
+    def __init__(self, config, logger, executor):
+        self.config = config
+        self.logger = logger
+        self.executor = executor
+        self._recently_processed: OrderedDict[tuple, float] = OrderedDict()
+        self._pending: dict[str, None] = {}  # insertion-ordered set
+        self._flush_timer: threading.Timer | None = None
+        self._batch_started = 0.0
+        self._in_flight: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _log(self, message: str):
+        """Report watcher progress; overridden by the GUI."""
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._schedule(event.dest_path)
+
+    def _schedule(self, src_path: str):
+        """Queue a path and (re)arm the batch flush timer."""
+        file_path = os.path.normpath(src_path)
+        with self._lock:
+            self._pending[file_path] = None
+            now = time.monotonic()
+            if self._flush_timer is not None:
+                # Keep pushing the flush back while the burst continues,
+                # but never past the max delay for the oldest pending path
+                if now - self._batch_started >= _COALESCE_MAX_DELAY:
+                    return
+                self._flush_timer.cancel()
+            else:
+                self._batch_started = now
+            self._flush_timer = threading.Timer(_COALESCE_LATENCY, self._flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush(self):
+        """Hand every path queued since the last flush to _handle."""
+        with self._lock:
+            if self._flush_timer is not threading.current_thread():
+                return  # superseded by a later timer
+            self._flush_timer = None
+            batch = list(self._pending)
+            self._pending.clear()
+        for file_path in batch:
+            self._handle(file_path)
+
+    def _should_process(self, file_path: str) -> bool:
+        """
+        Claim *file_path* for processing unless its current signature was
+        handled within the dedup window or it is already in flight.
+
+        Only the dedup map and in-flight set are touched under the lock.
+        """
+        key = _event_key(file_path)
+        if key is None:
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            last = self._recently_processed.get(key, 0)
+            if now - last < _DEDUP_WINDOW or file_path in self._in_flight:
+                return False
+            self._in_flight.add(file_path)
+            self._recently_processed[key] = now
+            self._recently_processed.move_to_end(key)
+
+            # Prune from the oldest end until the head is still fresh
+            cutoff = now - _DEDUP_WINDOW * 2
+            while self._recently_processed:
+                oldest = next(iter(self._recently_processed.values()))
+                if (oldest > cutoff and
+                        len(self._recently_processed) <= _DEDUP_MAX_ENTRIES):
+                    break
+                self._recently_processed.popitem(last=False)
+        return True
+
+    def _handle(self, file_path: str):
+        if not self._should_process(file_path):
+            return
+
+        self._log(f"Detected: {file_path}")
+        try:
+            future = self.executor.submit(self._process, file_path)
+        except RuntimeError:
+            # Executor already shut down (watcher stopping)
+            self._release(file_path)
+            return
+        # Runs when the task finishes or is cancelled by executor shutdown
+        future.add_done_callback(lambda _f: self._release(file_path))
+
+    def _release(self, file_path: str):
+        """Drop *file_path* from the in-flight set; flush once all are done."""
+        with self._lock:
+            self._in_flight.discard(file_path)
+            idle = not self._in_flight
+        if idle:
+            # Persist reference entries queued during this burst
+            self.config.flush_references()
+
+    def _process(self, file_path: str):
+        """Worker-pool task: wait for the write to settle, then run the pipeline."""
+        try:
+            # Let file writes finish; bail if the file was moved by a prior event
+            if not wait_for_stable_file(file_path):
+                self._log(f"  Skipped (already moved): {file_path}")
+                return
+
+            result = process_file(file_path, self.config, self.logger)
+            decision = result.get("routing", {}).get("decision", "unknown")
+            best = result.get("best_type", "none")
+            self._log(f"  Processed: {decision} | type={best}")
+        except Exception as e:
+            # pipeline.py already logs errors before re-raising
+            self._log(f"  ERROR: {e}")
@@ -4,6 +4,7 @@
 import json
 import pathlib
 import logging
+import threading
 from datetime import datetime
 
 
@@ -13,6 +14,7 @@ class AutoFilerLogger:
     def __init__(self, log_path: str):
         self._log_path = pathlib.Path(log_path)
         self._log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
 
         # Also configure Python's logging for console output
         self._py_logger = logging.getLogger("autofiler")
@@ -27,8 +29,10 @@ class AutoFilerLogger:
     def _write(self, entry: dict):
         """Append a JSON-line entry to the log file."""
         entry["timestamp"] = datetime.now().isoformat()
-        with open(self._log_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self._log_path, "a", encoding="utf-8") as f:
+                f.write(line)
 
     def log_auto_file(self, pipeline_result: dict):
         """Log a Stage 1 staging action."""
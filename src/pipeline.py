@@ -1,13 +1,15 @@
 # src/pipeline.py
 """Stage 1 pipeline: classify -> score -> route -> extract -> stage."""
 
+import os
 import pathlib
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 from src.classifier import classify_file
 from src.scorer import score_candidates, select_best_candidate
 from src.router import route_file, move_to_review
-from src.content_matcher import extract_fields
+from src.content_matcher import TextBundle, extract_fields
 from src.field_resolver import resolve_fields
 from src.guards import check_file
 from src.sidecar import generate_sidecar, hash_file
@@ -15,6 +17,20 @@ from src.staging_namer import generate_staging_name
 from src.vault import archive_to_vault
 
 
+def create_intake_executor(settings: dict) -> ThreadPoolExecutor:
+    """
+    Build the worker pool that runs process_file for the intake watcher.
+
+    OCR runs in tesseract subprocesses, so plain threads already scale
+    across cores. Each tesseract is pinned to one OpenMP thread so
+    concurrent jobs don't oversubscribe the CPU; the pool is sized by
+    the optional "intake_workers" setting (default: one per core).
+    """
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    workers = settings.get("intake_workers") or os.cpu_count()
+    return ThreadPoolExecutor(max_workers=workers)
+
+
 def process_file(file_path: str, config, logger=None) -> dict:
     """
     Run the Stage 1 pipeline on a single file.
@@ -42,7 +58,7 @@ def process_file(file_path: str, config, logger=None) -> dict:
 
     try:
         # 1. Classify
-        classification = classify_file(file_path, config)
+        classification = classify_file(file_path, config, early_exit=True)
 
         # 2. Score
         scored = score_candidates(classification, rules)
@@ -66,13 +82,16 @@ def process_file(file_path: str, config, logger=None) -> dict:
         extracted_fields = None
         if routing["decision"] == "auto_file":
             extracted_text = classification.get("extracted_text", "")
+            # Shared by extraction and resolution so the text is
+            # lowercased/split into lines at most once
+            text_bundle = TextBundle(extracted_text)
             extracted_fields, missing = extract_fields(
-                extracted_text, best_type, config.type_definitions
+                text_bundle, best_type, config.type_definitions
             )
 
             # Resolve name fields against entity reference
             extracted_fields, missing, resolution_info = resolve_fields(
-                extracted_fields, missing, extracted_text,
+                extracted_fields, missing, text_bundle,
                 best_type, config, logger,
             )
 
@@ -7,6 +7,8 @@ import shutil
 from src.classifier import classify_file
 from src.scorer import score_candidates, select_best_candidate
 from src.content_matcher import extract_fields
+from src.derived_cache import invalidate
+from src.config_loader import lock_for
 from src.field_resolver import resolve_fields, create_entity, _update_entity_metadata
 from src.gap_analyzer import analyze_classification_gap, analyze_extraction_gap
 from src.sidecar import generate_sidecar, hash_file
@@ -84,6 +86,8 @@ def attempt_extraction(
         extracted_fields, missing, extracted_text,
         type_name, config, logger,
     )
+    # Interactive path: persist any auto-created entities right away
+    config.flush_references()
 
     return {
         "extracted_fields": extracted_fields,
@@ -213,38 +217,41 @@ def _auto_add_manual_references(
     field_defs = typedef.get("extraction_fields", {})
     doc_type_code = typedef.get("code", "000")
 
-    reference_entries = config.load_reference(REF_PATH)
-    ref_changed = False
+    with lock_for(REF_PATH):
+        reference_entries = config.load_reference(REF_PATH)
+        ref_changed = False
 
-    for field_name, value in manual_fields.items():
-        if not value:
-            continue
-        field_cfg = field_defs.get(field_name, {})
-        lookup = field_cfg.get("reference_lookup")
-        if not lookup:
-            continue
+        for field_name, value in manual_fields.items():
+            if not value:
+                continue
+            field_cfg = field_defs.get(field_name, {})
+            lookup = field_cfg.get("reference_lookup")
+            if not lookup:
+                continue
 
-        role = lookup["role"]
+            role = lookup["role"]
 
-        # Check if entity already exists
-        from src.fuzzy_matcher import fuzzy_match
-        matched_key, ratio = fuzzy_match(
-            value, reference_entries, threshold=0.80
-        )
-
-        if matched_key:
-            _update_entity_metadata(
-                reference_entries[matched_key], role, doc_type_code
-            )
-            ref_changed = True
-        else:
-            entity_key, entity_dict = create_entity(
-                value, role, doc_type_code, reference_entries
+            # Check if entity already exists
+            from src.fuzzy_matcher import fuzzy_match
+            matched_key, ratio = fuzzy_match(
+                value, reference_entries, threshold=0.80
             )
-            reference_entries[entity_key] = entity_dict
-            ref_changed = True
-            if logger:
-                logger.log_reference_entry(field_name, value, entity_dict)
 
-    if ref_changed:
-        config.save_reference(REF_PATH, reference_entries)
+            if matched_key:
+                if _update_entity_metadata(
+                    reference_entries[matched_key], role, doc_type_code
+                ):
+                    ref_changed = True
+            else:
+                entity_key, entity_dict = create_entity(
+                    value, role, doc_type_code, reference_entries
+                )
+                reference_entries[entity_key] = entity_dict
+                # Later fields in this loop must see the new entity
+                invalidate(reference_entries, "fuzzy_candidates")
+                ref_changed = True
+                if logger:
+                    logger.log_reference_entry(field_name, value, entity_dict)
+
+        if ref_changed:
+            config.save_reference(REF_PATH, reference_entries)
@@ -2,7 +2,7 @@
 """Interactive terminal prompts for manual file review."""
 
 import pathlib
-from src.detectors import detect_extension, detect_mime, get_file_metadata
+from src.detectors import detect_all
 
 
 def display_file_info(
@@ -12,9 +12,10 @@ def display_file_info(
 ):
     """Print a summary of the file to help the user classify it."""
     p = pathlib.Path(file_path)
-    meta = get_file_metadata(file_path)
-    ext = detect_extension(file_path)
-    mime = detect_mime(file_path)
+    detected = detect_all(file_path)
+    meta = detected["metadata"]
+    ext = detected["extension"]
+    mime = detected["mime_type"]
 
     print("\n" + "=" * 60)
     print(f"  FILE REVIEW")
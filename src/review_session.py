@@ -29,6 +29,20 @@ def run_review_session(config, logger=None):
         print("No files to review.")
         return
 
+    try:
+        _review_pending(pending, queue, config, settings, logger)
+    finally:
+        # Auto-created reference entries are queued; write them once
+        config.flush_references()
+
+    # Final summary
+    final = queue.summary()
+    print(f"\nSession complete. Pending: {final['pending']}, "
+          f"Resolved: {final['resolved']}")
+
+
+def _review_pending(pending, queue, config, settings, logger):
+    """Prompt for and file each pending path in turn."""
     for i, file_path in enumerate(pending, 1):
         print(f"\n--- File {i} of {len(pending)} ---")
         queue.mark_in_review(file_path)
@@ -110,8 +124,3 @@ def run_review_session(config, logger=None):
                 file_path, type_name, result['destination'],
                 new_type=(action == "new")
             )
-
-    # Final summary
-    final = queue.summary()
-    print(f"\nSession complete. Pending: {final['pending']}, "
-          f"Resolved: {final['resolved']}")